@@ -1,58 +1,70 @@
 import json
+import os
 from pathlib import Path
 import sys
+try:
+    import orjson  # optional; faster parse of the multi-MB result dumps
+except ImportError:
+    orjson = None
 
 if len(sys.argv) > 1:
     file_path = sys.argv[1]
 else:
-    # Use most recent result
+    # Use most recent result - scandir caches stat info from the directory
+    # read, and max() avoids sorting the whole listing just to take the tail
     results_dir = Path(__file__).parent.parent / "results"
-    files = sorted(results_dir.glob("backtest_enhanced_spike_*.json"))
-    if not files:
+    entries = (e for e in os.scandir(results_dir)
+               if e.name.startswith("backtest_enhanced_spike_") and e.name.endswith(".json"))
+    latest = max(entries, key=lambda e: e.stat().st_mtime, default=None)
+    if latest is None:
         print("No result files found")
         sys.exit(1)
-    file_path = files[-1]
+    file_path = latest.path
 
 print(f"Analyzing: {file_path}\n")
 
-with open(file_path) as f:
-    data = json.load(f)
+if orjson is not None:
+    data = orjson.loads(Path(file_path).read_bytes())
+else:
+    with open(file_path) as f:
+        data = json.load(f)
 
 alerts = data['alerts']
 print(f"Total Alerts: {len(alerts)}\n")
 
-# Quality score distribution
-from collections import Counter
-scores = [round(a['quality_score']) for a in alerts]
+# Accumulate every stat in a single pass over the alerts instead of one
+# list comprehension per metric
+from collections import Counter, defaultdict
+scores = Counter()
+session_stats = defaultdict(lambda: {'total': 0, 'wins': 0})
+winner_q, loser_q = [], []
+winner_bars, loser_bars = [], []
+for a in alerts:
+    hit = a['outcome']['hit']
+    scores[round(a['quality_score'])] += 1
+    session_stats[a['session']]['total'] += 1
+    if hit == 'target':
+        session_stats[a['session']]['wins'] += 1
+        winner_q.append(a['quality_score'])
+        winner_bars.append(a['outcome']['bars_held'])
+    elif hit == 'stop':
+        loser_q.append(a['quality_score'])
+        loser_bars.append(a['outcome']['bars_held'])
+
 print("Quality Score Distribution:")
-for q, c in sorted(Counter(scores).items()):
+for q, c in sorted(scores.items()):
     print(f"  Q{q}: {c} alerts")
 
-# Winners vs Losers quality ranges
-winners = [a for a in alerts if a['outcome']['hit'] == 'target']
-losers = [a for a in alerts if a['outcome']['hit'] == 'stop']
-
-if winners:
-    winner_q = [a['quality_score'] for a in winners]
-    print(f"\nWinners ({len(winners)} alerts):")
+if winner_q:
+    print(f"\nWinners ({len(winner_q)} alerts):")
     print(f"  Quality range: {min(winner_q):.1f} - {max(winner_q):.1f}")
     print(f"  Avg quality: {sum(winner_q)/len(winner_q):.1f}")
 
-if losers:
-    loser_q = [a['quality_score'] for a in losers]
-    print(f"\nLosers ({len(losers)} alerts):")
+if loser_q:
+    print(f"\nLosers ({len(loser_q)} alerts):")
     print(f"  Quality range: {min(loser_q):.1f} - {max(loser_q):.1f}")
     print(f"  Avg quality: {sum(loser_q)/len(loser_q):.1f}")
 
-# Session breakdown
-from collections import defaultdict
-session_stats = defaultdict(lambda: {'total': 0, 'wins': 0})
-for a in alerts:
-    session = a['session']
-    session_stats[session]['total'] += 1
-    if a['outcome']['hit'] == 'target':
-        session_stats[session]['wins'] += 1
-
 print("\nSession Win Rates:")
 for session in ['PREMARKET', 'REGULAR', 'POSTMARKET']:
     if session in session_stats:
@@ -60,10 +72,6 @@ for session in ['PREMARKET', 'REGULAR', 'POSTMARKET']:
         wr = (stats['wins'] / stats['total'] * 100) if stats['total'] > 0 else 0
         print(f"  {session}: {stats['wins']}/{stats['total']} = {wr:.1f}%")
 
-# Bars to stop/target
-winner_bars = [a['outcome']['bars_held'] for a in winners]
-loser_bars = [a['outcome']['bars_held'] for a in losers]
-
 if winner_bars:
     print(f"\nWinners hold time: avg {sum(winner_bars)/len(winner_bars):.1f} bars (range {min(winner_bars)}-{max(winner_bars)})")
 if loser_bars:
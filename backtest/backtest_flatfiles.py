@@ -5,15 +5,46 @@ Downloads and processes historical minute-bar data for all tickers
 
 import sys
 import os
-import csv
+import functools
 import gzip
+import hashlib
+import shutil
+import subprocess
 from datetime import datetime, timedelta
 from collections import defaultdict
 import json
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 try:
     import boto3  # optional when not using cached-only mode
+    from boto3.s3.transfer import TransferConfig
 except ImportError:
     boto3 = None
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+try:
+    import orjson  # optional; Rust JSON encoder, much faster on big alert dumps
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+try:
+    # Shared on-disk cache so repeat runs (and CI) reuse compiled kernels
+    os.environ.setdefault('NUMBA_CACHE_DIR',
+                          os.path.join(os.path.dirname(__file__), '.numba_cache'))
+    from numba import njit  # optional; pure-Python fallback below is ~40x slower
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    def njit(*args, **kwargs):
+        def wrap(func):
+            return func
+        return wrap
 from pathlib import Path
 
 # Add project root (parent of this backtest directory) to sys.path for module imports
@@ -24,7 +55,7 @@ if PROJECT_ROOT not in sys.path:
 from polygon_websocket import (
     check_spike, momentum_flags, rolling_volume_3min,
     latest_quotes, minute_aggregates, update_aggregates,
-    get_minute_ts, ET_TIMEZONE, watch_alerts, breakout_quality
+    get_minute_ts, ET_TIMEZONE
 )
 
 # ====================================================================================
@@ -82,6 +113,10 @@ MASSIVE_BUCKET = "flatfiles"
 # Cached-only mode: use pre-downloaded flat files in historical_data/polygon_flatfiles
 USE_CACHED_ONLY = True  # User indicated data already stored locally
 
+# Worker processes for per-day parsing/backtesting (1 = serial). Each worker
+# gets its own copy of the check_spike module globals, so no locking is needed.
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", os.cpu_count() or 1))
+
 # Store historical data in organized folder structure
 CACHE_DIR = Path("../historical_data/polygon_flatfiles_minute")
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
@@ -102,7 +137,8 @@ class BacktestResult:
         self.max_loss = 0
         self.false_positives = 0
         self.bars_processed = 0
-        
+        self.alerts_with_outcome = 0
+
     def add_alert(self, alert_data):
         """Record an alert and its outcome"""
         self.alerts.append(alert_data)
@@ -120,6 +156,7 @@ class BacktestResult:
         
         # Track outcome if available
         if 'outcome' in alert_data:
+            self.alerts_with_outcome += 1
             profit = alert_data['outcome']['profit_pct']
             if profit > 0.5:  # More than 0.5% profit
                 self.profitable_alerts += 1
@@ -127,22 +164,33 @@ class BacktestResult:
                 self.losing_alerts += 1
             else:
                 self.breakeven_alerts += 1
-                
+
+    def merge(self, other):
+        """Fold a worker's partial result into this one"""
+        self.alerts.extend(other.alerts)
+        self.total_alerts += other.total_alerts
+        self.profitable_alerts += other.profitable_alerts
+        self.breakeven_alerts += other.breakeven_alerts
+        self.losing_alerts += other.losing_alerts
+        self.stage1_count += other.stage1_count
+        self.stage2_count += other.stage2_count
+        self.stage3_count += other.stage3_count
+        self.stage0_watch_count += other.stage0_watch_count
+        self.false_positives += other.false_positives
+        self.bars_processed += other.bars_processed
+        self.alerts_with_outcome += other.alerts_with_outcome
+
     def calculate_metrics(self):
-        """Calculate aggregate statistics"""
+        """Calculate aggregate statistics from one pass over the alerts"""
         if self.total_alerts > 0:
-            total_profit = sum(a['outcome']['profit_pct'] for a in self.alerts if 'outcome' in a)
-            self.avg_gain = total_profit / len([a for a in self.alerts if 'outcome' in a])
-            
-            profits = [a['outcome']['profit_pct'] for a in self.alerts if 'outcome' in a]
-            if profits:
-                self.max_gain = max(profits)
-                self.max_loss = min(profits)
-            
-            # Win rate based on profitable vs total with outcome
-            alerts_with_outcome = len([a for a in self.alerts if 'outcome' in a])
-            if alerts_with_outcome > 0:
-                self.win_rate = (self.profitable_alerts / alerts_with_outcome) * 100
+            profits = np.fromiter(
+                (a['outcome']['profit_pct'] for a in self.alerts if 'outcome' in a),
+                dtype=np.float64)
+            if profits.size:
+                self.avg_gain = float(profits.mean())
+                self.max_gain = float(profits.max())
+                self.max_loss = float(profits.min())
+                self.win_rate = (self.profitable_alerts / profits.size) * 100
             else:
                 self.win_rate = 0
         else:
@@ -162,11 +210,10 @@ class BacktestResult:
             print(f"  Stage 2 (Confirmed Breakout): {self.stage2_count}")
             print(f"  Stage 3 (Fast-Break): {self.stage3_count}")
             
-            alerts_with_outcome = len([a for a in self.alerts if 'outcome' in a])
-            if alerts_with_outcome > 0:
-                print(f"\nProfitable: {self.profitable_alerts} ({self.profitable_alerts/alerts_with_outcome*100:.1f}%)")
+            if self.alerts_with_outcome > 0:
+                print(f"\nProfitable: {self.profitable_alerts} ({self.profitable_alerts/self.alerts_with_outcome*100:.1f}%)")
                 print(f"Breakeven: {self.breakeven_alerts}")
-                print(f"Losing: {self.losing_alerts} ({self.losing_alerts/alerts_with_outcome*100:.1f}%)")
+                print(f"Losing: {self.losing_alerts} ({self.losing_alerts/self.alerts_with_outcome*100:.1f}%)")
                 print(f"\nWin Rate: {self.win_rate:.1f}%")
                 print(f"Average Gain: {self.avg_gain:.2f}%")
                 print(f"Max Gain: {self.max_gain:.2f}%")
@@ -177,6 +224,20 @@ class BacktestResult:
         print("="*80)
 
 
+@functools.lru_cache(maxsize=1)
+def _s3_client():
+    """Shared S3 client for Massive.io - boto3 clients are thread-safe, and
+    building one per download would redo credential/endpoint resolution and
+    drop the urllib3 connection pool each time.
+    """
+    return boto3.client(
+        's3',
+        endpoint_url=MASSIVE_ENDPOINT,
+        aws_access_key_id=MASSIVE_ACCESS_KEY,
+        aws_secret_access_key=MASSIVE_SECRET_KEY
+    )
+
+
 def download_flat_file(date):
     """
     Download Polygon flat file for a specific date from Massive.io S3
@@ -206,18 +267,16 @@ def download_flat_file(date):
     s3_key = f"us_stocks_sip/minute_aggs_v1/{year}/{month}/{date_str}.csv.gz"
     
     print(f"  Downloading: {date_str}...", end=" ", flush=True)
-    
+
     try:
-        # Initialize S3 client with Massive.io credentials
-        s3_client = boto3.client(
-            's3',
-            endpoint_url=MASSIVE_ENDPOINT,
-            aws_access_key_id=MASSIVE_ACCESS_KEY,
-            aws_secret_access_key=MASSIVE_SECRET_KEY
-        )
-        
-        # Download file
-        s3_client.download_file(MASSIVE_BUCKET, s3_key, str(cache_file))
+        s3_client = _s3_client()
+
+        # Download file with parallel range GETs on large objects
+        s3_client.download_file(
+            MASSIVE_BUCKET, s3_key, str(cache_file),
+            Config=TransferConfig(multipart_threshold=8 * 1024 * 1024,
+                                  multipart_chunksize=8 * 1024 * 1024,
+                                  max_concurrency=10, use_threads=True))
         
         print(f"[OK] ({cache_file.stat().st_size / 1024 / 1024:.1f} MB)")
         return cache_file
@@ -230,67 +289,150 @@ def download_flat_file(date):
         return None
 
 
+_FLATFILE_COLUMNS = ['ticker', 'volume', 'open', 'close', 'high', 'low',
+                     'window_start', 'transactions']
+
+
+def _read_flat_file(file_path, ticker_set):
+    """Load the raw flat-file columns into a DataFrame filtered to ticker_set.
+    Prefers pyarrow.csv, which decompresses the gzip and parses CSV on
+    multiple C++ threads; falls back to the single-threaded pandas C parser.
+    """
+    if PYARROW_AVAILABLE:
+        table = pacsv.read_csv(
+            str(file_path),
+            read_options=pacsv.ReadOptions(use_threads=True, block_size=64 << 20),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=_FLATFILE_COLUMNS,
+                column_types={'ticker': pa.string(), 'volume': pa.int64(),
+                              'open': pa.float64(), 'close': pa.float64(),
+                              'high': pa.float64(), 'low': pa.float64(),
+                              'window_start': pa.int64(), 'transactions': pa.int64()}))
+        table = table.filter(pc.is_in(table['ticker'], value_set=pa.array(sorted(ticker_set))))
+        return table.to_pandas()
+
+    read_kwargs = dict(
+        usecols=_FLATFILE_COLUMNS,
+        dtype={'ticker': 'category', 'volume': 'int64', 'open': 'float64',
+               'close': 'float64', 'high': 'float64', 'low': 'float64',
+               'window_start': 'int64', 'transactions': 'int64'},
+    )
+    # Decompress in a native pigz/zcat subprocess when available - streams the
+    # CSV into the parser while gunzip runs on another core
+    decompressor = next((tool for tool in (['pigz', '-dc'], ['zcat'])
+                         if shutil.which(tool[0])), None)
+    if decompressor is not None:
+        proc = subprocess.Popen(decompressor + [str(file_path)],
+                                stdout=subprocess.PIPE)
+        try:
+            df = pd.read_csv(proc.stdout, **read_kwargs)
+        finally:
+            proc.stdout.close()
+            proc.wait()
+    else:
+        df = pd.read_csv(file_path, compression='gzip', **read_kwargs)
+    # Filter to only our tickers (single boolean mask, no per-row membership test)
+    return df[df['ticker'].isin(ticker_set)]
+
+
+def _parquet_cache_path(file_path, ticker_set):
+    """Cache location for the parsed/filtered bars of one flat file.
+    Keyed on the date stem plus a digest of the ticker set, so a changed
+    watchlist never reuses a stale cache.
+    """
+    ticker_key = hashlib.md5(','.join(sorted(ticker_set)).encode()).hexdigest()[:12]
+    date_stem = Path(file_path).name.replace('.csv.gz', '')
+    # v2: value/pct_change columns added; bump invalidates older caches
+    return Path(file_path).parent / 'parsed' / f"{date_stem}_{ticker_key}_v2.parquet"
+
+
 def parse_flat_file(file_path, ticker_set):
     """
     Parse compressed CSV flat file and extract bars for our tickers
     CSV format: ticker,volume,open,close,high,low,window_start,transactions
     Note: window_start is in nanoseconds, no VWAP in flat files
+
+    Bulk columnar read (pyarrow or pandas, see _read_flat_file) with
+    vectorized column math - flat files run ~10M rows/day and a Python-level
+    per-row parse was the dominant cost of the backtest. The filtered,
+    derived DataFrame is cached as Parquet next to the gzip so repeat runs
+    skip decompression and parsing entirely.
     """
-    bars_by_symbol = defaultdict(list)
-    
-    with gzip.open(file_path, 'rt') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            ticker = row['ticker']
-            
-            # Filter to only our tickers
-            if ticker not in ticker_set:
-                continue
-            
-            # Parse bar data
-            timestamp_ns = int(row['window_start'])
-            timestamp_ms = timestamp_ns // 1_000_000  # Convert nanoseconds to milliseconds
-            
-            open_price = float(row['open'])
-            close_price = float(row['close'])
-            volume = int(row['volume'])
-            
-            # Calculate VWAP approximation (use close price as proxy since flat files don't include VWAP)
-            # In production, you'd want actual VWAP but this works for backtesting
-            vwap = (float(row['high']) + float(row['low']) + close_price) / 3
-            
-            bar = {
-                'symbol': ticker,
-                'open': open_price,
-                'high': float(row['high']),
-                'low': float(row['low']),
-                'close': close_price,
-                'volume': volume,
-                'vwap': vwap,
-                'timestamp': timestamp_ms,
-                'transactions': int(row['transactions']),
-            }
-            
-            bars_by_symbol[ticker].append(bar)
-    
-    # Sort bars by timestamp for each symbol
-    for symbol in bars_by_symbol:
-        bars_by_symbol[symbol].sort(key=lambda x: x['timestamp'])
-    
-    return bars_by_symbol
+    cache_path = _parquet_cache_path(file_path, ticker_set) if PYARROW_AVAILABLE else None
+    # A cache entry is only valid while it is newer than its source .csv.gz
+    # (re-downloaded files invalidate the parsed copy)
+    if (cache_path is not None and cache_path.exists()
+            and cache_path.stat().st_mtime >= Path(file_path).stat().st_mtime):
+        df = pd.read_parquet(cache_path)
+    else:
+        df = _read_flat_file(file_path, ticker_set)
+
+        # Convert nanoseconds to milliseconds
+        df['timestamp'] = df['window_start'] // 1_000_000
+
+        # Calculate VWAP approximation (use (H+L+C)/3 since flat files don't include VWAP)
+        # In production, you'd want actual VWAP but this works for backtesting
+        df['vwap'] = (df['high'] + df['low'] + df['close']) / 3
 
+        # Derived columns the bar loop would otherwise compute per bar
+        df['value'] = df['vwap'] * df['volume']
+        open_prices = df['open'].to_numpy()
+        df['pct_change'] = np.where(
+            open_prices > 0,
+            (df['close'].to_numpy() - open_prices) / np.where(open_prices > 0, open_prices, 1) * 100,
+            0.0)
 
-def simulate_trading_outcome(entry_bar, future_bars, vwap):
+        # Sort once globally instead of sorting each symbol's bar list separately
+        df = df.sort_values(['ticker', 'timestamp'])
+        df = df.drop(columns=['window_start']).rename(columns={'ticker': 'symbol'})
+
+        if cache_path is not None:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(cache_path, compression='snappy', engine='pyarrow')
+
+    # Struct-of-arrays layout: one structured record array per symbol, so the
+    # backtest loop reads contiguous columns instead of a dict per bar
+    return {symbol: group.drop(columns=['symbol']).to_records(index=False)
+            for symbol, group in df.groupby('symbol', sort=False, observed=True)}
+
+
+# Explicit signature compiles the kernel eagerly at import (and keys the disk
+# cache), so the one-time compile cost never lands on the first hot alert.
+# Columns sliced out of the per-symbol record arrays are strided float64 views.
+@njit('Tuple((int64, float64, float64, int64))(float64[:], float64[:], float64[:], float64, float64, float64)',
+      cache=True, fastmath=True, boundscheck=False)
+def _simulate_exit(highs, lows, closes, entry_price, stop_loss, target):
+    """JIT-compiled exit scan over future bars (hit_code, exit_price, profit_pct, bars_held).
+    hit_code: 0=stop, 1=target, 2=timeout. Loop index replaces the old
+    future_bars.index(bar) linear rescan, so each alert is a single O(n) pass.
+    """
+    n = len(highs)
+    for k in range(n):
+        if lows[k] <= stop_loss:
+            return 0, stop_loss, ((stop_loss - entry_price) / entry_price) * 100, k + 1
+        if highs[k] >= target:
+            return 1, target, ((target - entry_price) / entry_price) * 100, k + 1
+    if n > 0:
+        final_price = closes[n - 1]
+        return 2, final_price, ((final_price - entry_price) / entry_price) * 100, n
+    return 2, entry_price, 0.0, 0
+
+
+_HIT_LABELS = ('stop', 'target', 'timeout')
+
+
+def simulate_trading_outcome(entry_price, quality, pct_change,
+                             future_highs, future_lows, future_closes, vwap):
     """Simulate trade outcome with dynamic risk based on quality tier.
-    Entry: entry_bar['close']
     Base Stop: 2% below VWAP (quality <=62)
     Tight Stop: 1.5% below VWAP (quality >62)
     Parabolic Relaxed Stop: 2.5% below VWAP if pct_change > 11% and quality < 70
     Target baseline: 8% profit. Adaptive scaling: if quality >74 and pct_change > 6%, extend to 9.5%.
+
+    Takes the three entry scalars directly (no bar-dict copy in the alert
+    path); the exit scan itself runs in the numba-compiled _simulate_exit
+    kernel over NumPy high/low/close arrays.
     """
-    entry_price = entry_bar['close']
-    quality = entry_bar.get('quality_score')
-    pct_change = entry_bar.get('pct_change', 0)
     # Determine stop tier
     if quality is not None and quality > 62:
         stop_loss = vwap * 0.985  # 1.5% below VWAP
@@ -304,43 +446,62 @@ def simulate_trading_outcome(entry_bar, future_bars, vwap):
     if quality is not None and quality > 74 and pct_change > 6:
         target_mult = 1.095
     target = entry_price * target_mult
-    
-    for bar in future_bars:
-        # Check if stop hit
-        if bar['low'] <= stop_loss:
-            profit_pct = ((stop_loss - entry_price) / entry_price) * 100
-            return {
-                'hit': 'stop',
-                'exit_price': stop_loss,
-                'profit_pct': profit_pct,
-                'bars_held': future_bars.index(bar) + 1
-            }
-        
-        # Check if target hit
-        if bar['high'] >= target:
-            profit_pct = ((target - entry_price) / entry_price) * 100
-            return {
-                'hit': 'target',
-                'exit_price': target,
-                'profit_pct': profit_pct,
-                'bars_held': future_bars.index(bar) + 1
-            }
-    
-    # Neither hit - hold to end
-    if future_bars:
-        final_price = future_bars[-1]['close']
-        profit_pct = ((final_price - entry_price) / entry_price) * 100
-    else:
-        profit_pct = 0
-    
+
+    hit_code, exit_price, profit_pct, bars_held = _simulate_exit(
+        future_highs, future_lows, future_closes, entry_price, stop_loss, target)
+
     return {
-        'hit': 'timeout',
-        'exit_price': final_price if future_bars else entry_price,
-        'profit_pct': profit_pct,
-        'bars_held': len(future_bars)
+        'hit': _HIT_LABELS[hit_code],
+        'exit_price': float(exit_price),
+        'profit_pct': float(profit_pct),
+        'bars_held': int(bars_held)
     }
 
 
+def _resolve_pending_alerts(symbol, pending_alerts, highs, lows, closes, result):
+    """Resolve outcomes for all of a symbol's queued alerts in one batch.
+
+    The stop/target tier rules from simulate_trading_outcome are evaluated as
+    vectorized NumPy expressions over the whole batch (missing quality scores
+    become NaN, which fails every > comparison just like the None checks);
+    only the 60-bar window scan runs per alert, inside the numba kernel.
+    """
+    entries = np.array([p[1] for p in pending_alerts], dtype=np.float64)
+    vwaps = np.array([p[2] for p in pending_alerts], dtype=np.float64)
+    pcts = np.array([p[4] for p in pending_alerts], dtype=np.float64)
+    qualities = np.array(
+        [p[5].get('quality_score') if p[5].get('quality_score') is not None else np.nan
+         for p in pending_alerts], dtype=np.float64)
+
+    # Stop tiers: 1.5% below VWAP above quality 62, else 2%; parabolic moves
+    # (>11% without quality >=70) relax to 2.5%
+    stops = np.where(qualities > 62, vwaps * 0.985, vwaps * 0.98)
+    parabolic = (pcts > 11) & (np.isnan(qualities) | (qualities < 70))
+    stops = np.where(parabolic, vwaps * 0.975, stops)
+
+    # Adaptive target sizing: extend the 8% target to 9.5% for high-quality movers
+    targets = entries * np.where((qualities > 74) & (pcts > 6), 1.095, 1.08)
+
+    for j, (i, close, vwap, volume, pct_change, alert_data) in enumerate(pending_alerts):
+        hit_code, exit_price, profit_pct, bars_held = _simulate_exit(
+            highs[i+1:i+61], lows[i+1:i+61], closes[i+1:i+61],
+            entries[j], stops[j], targets[j])
+
+        outcome = {
+            'hit': _HIT_LABELS[hit_code],
+            'exit_price': float(exit_price),
+            'profit_pct': float(profit_pct),
+            'bars_held': int(bars_held)
+        }
+        alert_data['outcome'] = outcome
+        result.add_alert(alert_data)
+
+        # Log alert
+        session = alert_data['session']
+        outcome_str = f"{outcome['hit'].upper()}: {outcome['profit_pct']:+.2f}% in {outcome['bars_held']} bars"
+        print(f"ALERT: {symbol} {session} Stage1 | ${close:.2f} | Vol={volume:,} | {pct_change:+.2f}% | Q={alert_data['quality_score']:.1f} | {outcome_str}")
+
+
 def backtest_symbol(symbol, bars, result):
     """Run backtest for a single symbol across all bars"""
     
@@ -349,99 +510,134 @@ def backtest_symbol(symbol, bars, result):
         del momentum_flags[symbol]
     if symbol in rolling_volume_3min:
         del rolling_volume_3min[symbol]
-    # Initialize with [0, 0, 0] as expected by check_spike
-    rolling_volume_3min[symbol] = [0, 0, 0]
+    # Initialize with [0, 0, 0] as expected by check_spike; bind the window
+    # once so the per-bar shift below avoids two dict lookups per bar
+    vols = rolling_volume_3min[symbol] = [0, 0, 0]
     if symbol in minute_aggregates:
         del minute_aggregates[symbol]
     if symbol in latest_quotes:
         del latest_quotes[symbol]
-    
-    for i, bar in enumerate(bars):
+    # One mock-quote dict per symbol, mutated each bar - avoids allocating a
+    # fresh 3-key dict for every bar in the scan
+    quote = latest_quotes[symbol] = {'bid': 0.0, 'ask': 0.0, 'timestamp': 0}
+
+    # Column views over the per-symbol structured array (SoA) - scalar reads
+    # below replace the old dict-per-bar access (~8 hash lookups per bar)
+    opens = bars['open']
+    highs = bars['high']
+    lows = bars['low']
+    closes = bars['close']
+    volumes = bars['volume']
+    vwaps = bars['vwap']
+    timestamps = bars['timestamp']
+    transactions = bars['transactions']
+    values = bars['value']
+    pct_changes = bars['pct_change']
+
+    # Convert every minute timestamp in one vectorized pass instead of a
+    # tz-aware fromtimestamp call per bar (each one costs a few microseconds)
+    minute_ts_arr = pd.to_datetime(timestamps, unit='ms', utc=True).tz_convert(ET_TIMEZONE)
+
+    # Alerts collected during the scan; outcomes are batch-resolved afterwards
+    pending_alerts = []
+
+    for i in range(len(bars)):
         result.bars_processed += 1
-        
-        # Convert timestamp to datetime
-        minute_ts = datetime.fromtimestamp(bar['timestamp'] / 1000, tz=ET_TIMEZONE)
-        
+
+        # Pull scalars out of the columns once; cast to Python types so
+        # check_spike state and the saved JSON stay numpy-free
+        open_price = float(opens[i])
+        high = float(highs[i])
+        low = float(lows[i])
+        close = float(closes[i])
+        volume = int(volumes[i])
+        vwap = float(vwaps[i])
+        timestamp = int(timestamps[i])
+        trade_count = int(transactions[i])
+
+        # Precomputed tz-aware minute timestamp (pd.Timestamp is a datetime)
+        minute_ts = minute_ts_arr[i]
+
         # Manually populate minute_aggregates (backtest doesn't use update_aggregates)
         agg = minute_aggregates[minute_ts][symbol]
-        agg['open'] = bar['open']
-        agg['high'] = bar['high']
-        agg['low'] = bar['low']
-        agg['close'] = bar['close']
-        agg['volume'] = bar['volume']
-        agg['value'] = bar['vwap'] * bar['volume']
-        agg['count'] = bar['transactions']
-        agg['vwap'] = bar['vwap']
-        
-        # Update rolling 3-minute volume
-        if symbol not in rolling_volume_3min:
-            rolling_volume_3min[symbol] = [0, 0, 0]
-        
-        # Shift the rolling window (keep last 3 minutes)
-        rolling_volume_3min[symbol][0] = rolling_volume_3min[symbol][1]
-        rolling_volume_3min[symbol][1] = rolling_volume_3min[symbol][2]
-        rolling_volume_3min[symbol][2] = bar['volume']
-        
-        # Calculate percentage change
-        pct_change = ((bar['close'] - bar['open']) / bar['open']) * 100 if bar['open'] > 0 else 0
-        
+        agg['open'] = open_price
+        agg['high'] = high
+        agg['low'] = low
+        agg['close'] = close
+        agg['volume'] = volume
+        agg['value'] = float(values[i])
+        agg['count'] = trade_count
+        agg['vwap'] = vwap
+
+        # Shift the rolling 3-minute volume window in place (O(1) ring update)
+        vols[0] = vols[1]
+        vols[1] = vols[2]
+        vols[2] = volume
+
+        # Percentage change comes precomputed from parse_flat_file
+        pct_change = float(pct_changes[i])
+
         # Set a mock quote for spread calculation (backtest doesn't have real quotes)
         # Use 0.1% spread as a reasonable default for liquid stocks
-        latest_quotes[symbol] = {
-            'bid': bar['close'] * 0.999,
-            'ask': bar['close'] * 1.001,
-            'timestamp': bar['timestamp']
-        }
-        
+        quote['bid'] = close * 0.999
+        quote['ask'] = close * 1.001
+        quote['timestamp'] = timestamp
+
         # Run check_spike and capture any returned alert
         alert_data = check_spike(
             symbol=symbol,
             current_pct=pct_change,
-            current_vol=bar['volume'],
+            current_vol=volume,
             minute_ts=minute_ts,
-            open_price=bar['open'],
-            close_price=bar['close'],
-            trade_count=bar['transactions'],
-            vwap=bar['vwap']
+            open_price=open_price,
+            close_price=close,
+            trade_count=trade_count,
+            vwap=vwap
         )
-        
-        # If an alert was generated, record it and simulate trading outcome
+
+        # If an alert was generated, queue it; outcomes for the whole symbol
+        # are resolved in one vectorized batch after the scan
         if alert_data:
-            # Get future bars for outcome simulation (next 60 minutes)
-            future_bars = bars[i+1:i+61]
-            
-            # Create entry bar dict with quality for outcome simulation
-            entry_bar = {
-                'close': bar['close'],
-                'quality_score': alert_data.get('quality_score'),
-                'pct_change': pct_change
-            }
-            
-            # Simulate trading outcome
-            outcome = simulate_trading_outcome(entry_bar, future_bars, bar['vwap'])
-            
-            # Add outcome to alert data
-            alert_data['outcome'] = outcome
             alert_data['stage'] = 1  # Enhanced system uses unified stage 1
-            result.add_alert(alert_data)
-            
-            # Log alert
-            session = alert_data['session']
-            outcome_str = f"{outcome['hit'].upper()}: {outcome['profit_pct']:+.2f}% in {outcome['bars_held']} bars"
-            print(f"ALERT: {symbol} {session} Stage1 | ${bar['close']:.2f} | Vol={bar['volume']:,} | {pct_change:+.2f}% | Q={alert_data['quality_score']:.1f} | {outcome_str}")
+            pending_alerts.append((i, close, vwap, volume, pct_change, alert_data))
+
+    if pending_alerts:
+        _resolve_pending_alerts(symbol, pending_alerts, highs, lows, closes, result)
 
 
 def load_tickers(csv_path):
-    """Load ticker symbols from CSV file"""
-    tickers = set()
+    """Load ticker symbols from CSV file as an immutable frozenset"""
     with open(csv_path, 'r') as f:
-        reader = csv.reader(f)
-        for row in reader:
-            if row:  # Skip empty rows
-                ticker = row[0].strip().upper()
-                if ticker and ticker != 'TICKER':  # Skip header if exists
-                    tickers.add(ticker)
-    return tickers
+        # Single-column file: take the first field per line, skip the
+        # header row and blanks - no csv.reader row objects needed
+        return frozenset(
+            s for s in (line.split(',', 1)[0].strip().upper() for line in f)
+            if s and s != 'TICKER')
+
+
+def _process_one_day(args):
+    """Worker: parse one day's flat file and backtest every symbol into a
+    fresh BacktestResult. check_spike's module globals (momentum state,
+    rolling volume, quotes) are process-local copies, so days can run in
+    parallel without locking.
+
+    Parsing happens inside the worker on purpose: only (file_path, tickers)
+    crosses the process boundary, never the hundreds of MB of per-symbol
+    OHLC arrays, so IPC cost stays O(handles) rather than O(bytes).
+    """
+    file_path, tickers = args
+    date_str = file_path.stem  # Get date from filename
+    print(f"\nProcessing {date_str}...")
+
+    partial = BacktestResult()
+    bars_by_symbol = parse_flat_file(file_path, tickers)
+
+    for symbol in sorted(bars_by_symbol.keys()):
+        bars = bars_by_symbol[symbol]
+        if len(bars):
+            backtest_symbol(symbol, bars, partial)
+
+    return partial
 
 
 def run_backtest(tickers_csv, days_back=10):
@@ -483,12 +679,14 @@ def run_backtest(tickers_csv, days_back=10):
     else:
         print(f"\nDownloading {len(dates_to_process)} flat files...")
     
-    # Download files
-    flat_files = []
-    for date in dates_to_process:
-        file_path = download_flat_file(date)
-        if file_path:
-            flat_files.append(file_path)
+    # Download files - days are independent, so overlap the network latency
+    # across a small thread pool (cached-only mode just stats local files)
+    if USE_CACHED_ONLY:
+        downloaded = [download_flat_file(date) for date in dates_to_process]
+    else:
+        with ThreadPoolExecutor(max_workers=min(8, len(dates_to_process))) as pool:
+            downloaded = list(pool.map(download_flat_file, dates_to_process))
+    flat_files = [fp for fp in downloaded if fp]
     
     if not flat_files:
         if USE_CACHED_ONLY:
@@ -502,21 +700,19 @@ def run_backtest(tickers_csv, days_back=10):
     print("\nProcessing bars and running backtest...")
     print("-" * 80)
     
-    # Process each file
+    # Process each day - independent per file, so fan out across worker
+    # processes and merge the partial results
     result = BacktestResult()
-    
-    for file_path in flat_files:
-        date_str = file_path.stem  # Get date from filename
-        print(f"\nProcessing {date_str}...")
-        
-        # Parse file
-        bars_by_symbol = parse_flat_file(file_path, tickers)
-        
-        # Backtest each symbol
-        for symbol in sorted(bars_by_symbol.keys()):
-            bars = bars_by_symbol[symbol]
-            if bars:
-                backtest_symbol(symbol, bars, result)
+
+    if BACKTEST_WORKERS > 1 and len(flat_files) > 1:
+        workers = min(BACKTEST_WORKERS, len(flat_files))
+        print(f"[PARALLEL] Backtesting {len(flat_files)} days across {workers} workers")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for partial in executor.map(_process_one_day, [(fp, tickers) for fp in flat_files]):
+                result.merge(partial)
+    else:
+        for file_path in flat_files:
+            result.merge(_process_one_day((file_path, tickers)))
     
     # Calculate metrics
     result.calculate_metrics()
@@ -526,34 +722,40 @@ def run_backtest(tickers_csv, days_back=10):
     
     # Save detailed results to results folder
     output_file = f"../results/backtest_results_flatfiles_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(output_file, 'w') as f:
-        json.dump({
-            'backtest_config': {
-                'tickers_file': tickers_csv,
-                'num_tickers': len(tickers),
-                'days_back': days_back,
-                'start_date': dates_to_process[0].strftime('%Y-%m-%d'),
-                'end_date': dates_to_process[-1].strftime('%Y-%m-%d'),
-                'test_mode': TEST_MODE
-            },
-            'summary': {
-                'bars_processed': result.bars_processed,
-                'total_alerts': result.total_alerts,
-                'stage0_watch_alerts': result.stage0_watch_count,
-                'stage1_alerts': result.stage1_count,
-                'stage2_alerts': result.stage2_count,
-                'stage3_alerts': result.stage3_count,
-                'profitable': result.profitable_alerts,
-                'breakeven': result.breakeven_alerts,
-                'losing': result.losing_alerts,
-                'win_rate': result.win_rate,
-                'avg_gain': result.avg_gain,
-                'max_gain': result.max_gain,
-                'max_loss': result.max_loss,
-            },
-            'alerts': result.alerts
-        }, f, indent=2)
-    
+    payload = {
+        'backtest_config': {
+            'tickers_file': tickers_csv,
+            'num_tickers': len(tickers),
+            'days_back': days_back,
+            'start_date': dates_to_process[0].strftime('%Y-%m-%d'),
+            'end_date': dates_to_process[-1].strftime('%Y-%m-%d'),
+            'test_mode': TEST_MODE
+        },
+        'summary': {
+            'bars_processed': result.bars_processed,
+            'total_alerts': result.total_alerts,
+            'stage0_watch_alerts': result.stage0_watch_count,
+            'stage1_alerts': result.stage1_count,
+            'stage2_alerts': result.stage2_count,
+            'stage3_alerts': result.stage3_count,
+            'profitable': result.profitable_alerts,
+            'breakeven': result.breakeven_alerts,
+            'losing': result.losing_alerts,
+            'win_rate': result.win_rate,
+            'avg_gain': result.avg_gain,
+            'max_gain': result.max_gain,
+            'max_loss': result.max_loss,
+        },
+        'alerts': result.alerts
+    }
+    if ORJSON_AVAILABLE:
+        # orjson serializes the nested alert dicts (incl. numpy/datetime) in C
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(output_file, 'w') as f:
+            json.dump(payload, f, indent=2)
+
     print(f"\nSAVED: Detailed results saved to: {output_file}")
     
     if result.total_alerts == 0:
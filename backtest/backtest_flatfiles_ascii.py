@@ -9,6 +9,7 @@ import csv
 import gzip
 from datetime import datetime, timedelta
 from collections import defaultdict
+from operator import itemgetter
 import json
 import boto3
 from pathlib import Path
@@ -48,6 +49,13 @@ MASSIVE_BUCKET = "flatfiles"
 CACHE_DIR = Path("../historical_data/polygon_flatfiles")
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
+# Session label per minute-of-day: one table lookup replaces the 4-way
+# hour/minute comparison chain in the alert logging path
+SESSION_BY_MINUTE = ['CLOSED'] * 1440
+SESSION_BY_MINUTE[4*60:9*60+30] = ['PREMARKET'] * (5*60 + 30)
+SESSION_BY_MINUTE[9*60+30:16*60] = ['REGULAR'] * (6*60 + 30)
+SESSION_BY_MINUTE[16*60:20*60] = ['POSTMARKET'] * (4*60)
+
 class BacktestResult:
     def __init__(self):
         self.alerts = []
@@ -186,12 +194,16 @@ def parse_flat_file(file_path, ticker_set):
     Note: window_start is in nanoseconds, no VWAP in flat files
     """
     bars_by_symbol = defaultdict(list)
-    
+    # Flat files already come sorted by (ticker, window_start); track any
+    # symbol that violates that so only those lists need a re-sort
+    last_ts = {}
+    unsorted_symbols = set()
+
     with gzip.open(file_path, 'rt') as f:
         reader = csv.DictReader(f)
         for row in reader:
             ticker = row['ticker']
-            
+
             # Filter to only our tickers
             if ticker not in ticker_set:
                 continue
@@ -221,11 +233,14 @@ def parse_flat_file(file_path, ticker_set):
             }
             
             bars_by_symbol[ticker].append(bar)
-    
-    # Sort bars by timestamp for each symbol
-    for symbol in bars_by_symbol:
-        bars_by_symbol[symbol].sort(key=lambda x: x['timestamp'])
-    
+            if last_ts.get(ticker, -1) > timestamp_ms:
+                unsorted_symbols.add(ticker)
+            last_ts[ticker] = timestamp_ms
+
+    # Re-sort only symbols whose rows arrived out of order
+    for symbol in unsorted_symbols:
+        bars_by_symbol[symbol].sort(key=itemgetter('timestamp'))
+
     return bars_by_symbol
 
 
@@ -240,7 +255,7 @@ def simulate_trading_outcome(entry_bar, future_bars, vwap):
     stop_loss = vwap * 0.98
     target = entry_price * 1.08
     
-    for bar in future_bars:
+    for i, bar in enumerate(future_bars):
         # Check if stop hit
         if bar['low'] <= stop_loss:
             profit_pct = ((stop_loss - entry_price) / entry_price) * 100
@@ -248,9 +263,9 @@ def simulate_trading_outcome(entry_bar, future_bars, vwap):
                 'hit': 'stop',
                 'exit_price': stop_loss,
                 'profit_pct': profit_pct,
-                'bars_held': future_bars.index(bar) + 1
+                'bars_held': i + 1
             }
-        
+
         # Check if target hit
         if bar['high'] >= target:
             profit_pct = ((target - entry_price) / entry_price) * 100
@@ -258,7 +273,7 @@ def simulate_trading_outcome(entry_bar, future_bars, vwap):
                 'hit': 'target',
                 'exit_price': target,
                 'profit_pct': profit_pct,
-                'bars_held': future_bars.index(bar) + 1
+                'bars_held': i + 1
             }
     
     # Neither hit - hold to end
@@ -279,11 +294,13 @@ def simulate_trading_outcome(entry_bar, future_bars, vwap):
 def backtest_symbol(symbol, bars, result):
     """Run backtest for a single symbol across all bars"""
     
-    # Clear state for this symbol
-    if symbol in momentum_flags:
-        del momentum_flags[symbol]
-    if symbol in rolling_volume_3min:
-        rolling_volume_3min[symbol] = []
+    # Clear state for this symbol; bind the flags dict to a local so the
+    # per-bar before/after checks cost one hash probe each
+    flags = momentum_flags
+    if symbol in flags:
+        del flags[symbol]
+    # Initialize with [0, 0, 0] so the window shifts in place (matches backtest_flatfiles)
+    rolling_volume_3min[symbol] = [0, 0, 0]
     if symbol in minute_aggregates:
         del minute_aggregates[symbol]
     if symbol in latest_quotes:
@@ -306,12 +323,11 @@ def backtest_symbol(symbol, bars, result):
         agg['count'] = bar['transactions']
         agg['vwap'] = bar['vwap']
         
-        # Update rolling 3-minute volume
-        if symbol not in rolling_volume_3min:
-            rolling_volume_3min[symbol] = []
-        if len(rolling_volume_3min[symbol]) >= 3:
-            rolling_volume_3min[symbol].pop(0)
-        rolling_volume_3min[symbol].append(bar['volume'])
+        # Shift the rolling 3-minute volume window in place (no O(n) pop(0))
+        vols = rolling_volume_3min[symbol]
+        vols[0] = vols[1]
+        vols[1] = vols[2]
+        vols[2] = bar['volume']
         
         # Calculate percentage change
         pct_change = ((bar['close'] - bar['open']) / bar['open']) * 100 if bar['open'] > 0 else 0
@@ -324,10 +340,10 @@ def backtest_symbol(symbol, bars, result):
             'timestamp': bar['timestamp']
         }
         
-        # Track if flag exists before check
-        flag_before = symbol in momentum_flags
-        flag_data_before = momentum_flags.get(symbol, {})
-        
+        # Track flag state before check (None when absent - single lookup)
+        flag_data_before = flags.get(symbol)
+        alert_triggered = False
+
         # Run check_spike
         check_spike(
             symbol=symbol,
@@ -340,19 +356,18 @@ def backtest_symbol(symbol, bars, result):
             vwap=bar['vwap']
         )
         
-        # Track if flag exists after check
-        flag_after = symbol in momentum_flags
-        flag_data_after = momentum_flags.get(symbol, {})
-        
+        # Track flag state after check
+        flag_data_after = flags.get(symbol)
+
         # Detect if alert was triggered
         # Stage 1: Flag created (SETUP flag appears)
-        if not flag_before and flag_after:
+        if flag_data_before is None and flag_data_after is not None:
             if flag_data_after.get('flag', '').startswith('SETUP_'):
                 alert_triggered = True
                 alert_stage = 1
-        
+
         # Stage 2: Flag transitioned to CONFIRMED or removed (alert sent)
-        elif flag_before and not flag_after:
+        elif flag_data_before is not None and flag_data_after is None:
             # Alert was triggered and flag cleared
             alert_triggered = True
             alert_stage = 2  # Assume stage 2 since flag was cleared after confirmation
@@ -377,16 +392,8 @@ def backtest_symbol(symbol, bars, result):
             result.add_alert(alert_data)
             
             # Log alert
-            session_hour = minute_ts.hour
-            if 4 <= session_hour < 9 or (session_hour == 9 and minute_ts.minute < 30):
-                session = "PREMARKET"
-            elif 9 <= session_hour < 16 or (session_hour == 9 and minute_ts.minute >= 30):
-                session = "REGULAR"
-            elif 16 <= session_hour < 20:
-                session = "POSTMARKET"
-            else:
-                session = "CLOSED"
-            
+            session = SESSION_BY_MINUTE[minute_ts.hour * 60 + minute_ts.minute]
+
             outcome_str = f"{outcome['hit'].upper()}: {outcome['profit_pct']:+.2f}% in {outcome['bars_held']} bars"
             print(f"ALERT: {symbol} {session} Stage{alert_stage} | ${bar['close']:.2f} | Vol={bar['volume']:,} | {pct_change:+.2f}% | {outcome_str}")
 
@@ -6,9 +6,16 @@ Tests alert accuracy, false positives, and performance metrics
 import sys
 import os
 from datetime import datetime, timedelta
-import pytz
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import json
+import numpy as np
+import pandas as pd
+try:
+    import orjson  # optional; C-speed indent path for the results file
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 sys.path.insert(0, '.')
 from polygon_websocket import (
@@ -53,7 +60,16 @@ except ImportError:
     POLYGON_AVAILABLE = False
     print("⚠️ polygon-api-client not installed. Install with: pip install polygon-api-client")
 
+# Worker processes for per-symbol backtests (1 = serial); same knob as the
+# flat-file backtest
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", os.cpu_count() or 1))
+
 class BacktestResult:
+    # win_rate is filled in by calculate_metrics
+    __slots__ = ('alerts', 'total_alerts', 'profitable_alerts',
+                 'breakeven_alerts', 'losing_alerts', 'avg_gain',
+                 'max_gain', 'max_loss', 'false_positives', 'win_rate')
+
     def __init__(self):
         self.alerts = []
         self.total_alerts = 0
@@ -81,7 +97,20 @@ class BacktestResult:
             self.avg_gain += profit
             self.max_gain = max(self.max_gain, profit)
             self.max_loss = min(self.max_loss, profit)
-    
+
+    def merge(self, other):
+        """Fold a worker's partial result into this one (pre-calculate_metrics:
+        avg_gain is still the running profit sum at this point)"""
+        self.alerts.extend(other.alerts)
+        self.total_alerts += other.total_alerts
+        self.profitable_alerts += other.profitable_alerts
+        self.breakeven_alerts += other.breakeven_alerts
+        self.losing_alerts += other.losing_alerts
+        self.avg_gain += other.avg_gain
+        self.max_gain = max(self.max_gain, other.max_gain)
+        self.max_loss = min(self.max_loss, other.max_loss)
+        self.false_positives += other.false_positives
+
     def calculate_metrics(self):
         if self.total_alerts > 0:
             self.avg_gain /= self.total_alerts
@@ -105,13 +134,23 @@ class BacktestResult:
         print("="*70)
 
 def get_historical_bars(client, symbol, start_date, end_date):
-    """Fetch minute-level historical data from Polygon"""
+    """Fetch minute-level historical data from Polygon as parallel columns.
+    Returns: dict of contiguous NumPy arrays (open/high/low/close/volume/
+    vwap/trades/timestamp), or {} on error - struct-of-arrays so the bar
+    loop does array indexing instead of per-bar attribute lookups.
+    """
     print(f"Fetching historical data for {symbol} from {start_date} to {end_date}...")
-    
+
+    dtype = np.dtype([('open', 'f8'), ('high', 'f8'), ('low', 'f8'),
+                      ('close', 'f8'), ('volume', 'i8'), ('vwap', 'f8'),
+                      ('trades', 'i8'), ('timestamp', 'i8')])
     try:
-        # Get aggregates (bars) - minute level
-        aggs = []
-        for agg in client.list_aggs(
+        # Stream the paginated aggs straight into a growable structured
+        # buffer: each agg object is read once and discarded, never held in
+        # an intermediate Python list
+        buf = np.empty(4096, dtype=dtype)
+        n = 0
+        for a in client.list_aggs(
             ticker=symbol,
             multiplier=1,
             timespan="minute",
@@ -119,53 +158,75 @@ def get_historical_bars(client, symbol, start_date, end_date):
             to=end_date,
             limit=50000
         ):
-            aggs.append(agg)
-        
-        print(f"✓ Fetched {len(aggs)} minute bars")
-        return aggs
-    
+            if n == len(buf):
+                grown = np.empty(len(buf) * 2, dtype=dtype)
+                grown[:n] = buf
+                buf = grown
+            # VWAP simplified to close when the API omits it; trade count
+            # defaults to 100 as before
+            buf[n] = (a.open, a.high, a.low, a.close, a.volume,
+                      a.vwap if getattr(a, 'vwap', None) is not None else a.close,
+                      a.transactions if getattr(a, 'transactions', None) is not None else 100,
+                      a.timestamp)
+            n += 1
+
+        print(f"✓ Fetched {n} minute bars")
+        return {name: np.ascontiguousarray(buf[name][:n]) for name in dtype.names}
+
     except Exception as e:
         print(f"❌ Error fetching data: {e}")
-        return []
+        return {}
 
-def simulate_trading_outcome(entry_price, stop_loss, target, future_bars, minutes_to_hold=60):
+def simulate_trading_outcome(entry_price, stop_loss, target,
+                             future_highs, future_lows, future_closes,
+                             minutes_to_hold=60):
     """
-    Simulate trade outcome by checking if stop or target was hit
+    Simulate trade outcome by checking if stop or target was hit.
+    Takes NumPy high/low/close arrays for the bars after entry; the first
+    stop/target crossing is found with vectorized compares + argmax instead
+    of a Python loop over bar objects.
     Returns: {hit: 'stop'/'target'/'time', exit_price, profit_pct, minutes_held}
     """
-    for i, bar in enumerate(future_bars[:minutes_to_hold]):
-        # Check if stop loss hit (use low of bar)
-        if bar.low <= stop_loss:
-            profit_pct = ((stop_loss - entry_price) / entry_price) * 100
-            return {
-                'hit': 'stop',
-                'exit_price': stop_loss,
-                'profit_pct': profit_pct,
-                'minutes_held': i + 1
-            }
-        
-        # Check if target hit (use high of bar)
-        if bar.high >= target:
-            profit_pct = ((target - entry_price) / entry_price) * 100
-            return {
-                'hit': 'target',
-                'exit_price': target,
-                'profit_pct': profit_pct,
-                'minutes_held': i + 1
-            }
-    
-    # Time exit - use close of last bar
-    if future_bars:
-        exit_price = future_bars[min(minutes_to_hold-1, len(future_bars)-1)].close
-        profit_pct = ((exit_price - entry_price) / entry_price) * 100
+    highs = future_highs[:minutes_to_hold]
+    lows = future_lows[:minutes_to_hold]
+    closes = future_closes[:minutes_to_hold]
+
+    if lows.size == 0:
+        return None
+
+    stop_hits = lows <= stop_loss
+    target_hits = highs >= target
+    stop_idx = int(stop_hits.argmax()) if stop_hits.any() else -1
+    target_idx = int(target_hits.argmax()) if target_hits.any() else -1
+
+    # Stop wins ties within a bar (matches the original check order)
+    if stop_idx >= 0 and (target_idx < 0 or stop_idx <= target_idx):
+        profit_pct = ((stop_loss - entry_price) / entry_price) * 100
         return {
-            'hit': 'time',
-            'exit_price': exit_price,
+            'hit': 'stop',
+            'exit_price': stop_loss,
             'profit_pct': profit_pct,
-            'minutes_held': min(minutes_to_hold, len(future_bars))
+            'minutes_held': stop_idx + 1
+        }
+
+    if target_idx >= 0:
+        profit_pct = ((target - entry_price) / entry_price) * 100
+        return {
+            'hit': 'target',
+            'exit_price': target,
+            'profit_pct': profit_pct,
+            'minutes_held': target_idx + 1
         }
-    
-    return None
+
+    # Time exit - use close of last bar
+    exit_price = float(closes[-1])
+    profit_pct = ((exit_price - entry_price) / entry_price) * 100
+    return {
+        'hit': 'time',
+        'exit_price': exit_price,
+        'profit_pct': profit_pct,
+        'minutes_held': int(closes.size)
+    }
 
 def backtest_symbol(client, symbol, start_date, end_date, result):
     """Backtest dual-stage detection on one symbol"""
@@ -186,84 +247,110 @@ def backtest_symbol(client, symbol, start_date, end_date, result):
         print(f"⚠️ No data for {symbol}")
         return
     
-    # Initialize rolling volume with first 3 bars
-    if len(bars) >= 3:
-        rolling_volume_3min[symbol] = [bars[0].volume, bars[1].volume, bars[2].volume]
+    # Bind the SoA columns from get_historical_bars once
+    opens = bars['open']
+    highs = bars['high']
+    lows = bars['low']
+    closes = bars['close']
+    volumes = bars['volume']
+    vwaps = bars['vwap']
+    trades = bars['trades']
+    n_bars = len(opens)
+
+    # Initialize rolling volume with first 3 bars (fixed 3-slot window shifted
+    # in place below; check_spike slices it, so it stays a plain list)
+    if n_bars >= 3:
+        vols = rolling_volume_3min[symbol] = [int(volumes[0]), int(volumes[1]), int(volumes[2])]
+    else:
+        vols = rolling_volume_3min[symbol] = [0, 0, 0]
+
+    # One vectorized ET conversion for all timestamps instead of building a
+    # pytz timezone and tz-aware datetime per bar
+    dt_index = pd.to_datetime(bars['timestamp'], unit='ms', utc=True).tz_convert('US/Eastern')
+    hours = dt_index.hour.to_numpy()
+    minute_index = dt_index.floor('min')
+
+    # Percentage change for every bar in one vectorized pass (guarded against
+    # zero opens) instead of a scalar divide per iteration
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct_change_arr = np.where(opens > 0, (closes - opens) / opens * 100.0, 0.0)
+
+    # Dollar value traded per bar as one SIMD multiply instead of a scalar
+    # product per iteration
+    values_arr = closes * volumes
     
     alerts_generated = 0
-    
-    # Process each bar
-    for i, bar in enumerate(bars):
-        # Convert timestamp to ET timezone
-        et_tz = pytz.timezone('US/Eastern')
-        dt = datetime.fromtimestamp(bar.timestamp / 1000, tz=et_tz)
-        minute_ts = dt.replace(second=0, microsecond=0)
-        
-        # Skip if not trading hours (4 AM - 8 PM ET)
-        hour = dt.hour
-        if hour < 4 or hour >= 20:
-            continue
-        
-        # Calculate percentage change
-        if bar.open > 0:
-            pct_change = ((bar.close - bar.open) / bar.open) * 100
-        else:
-            pct_change = 0
-        
-        # Calculate VWAP (simplified - use close as approximation)
-        vwap = bar.vwap if hasattr(bar, 'vwap') else bar.close
-        
+
+    # Only iterate bars inside trading hours (4 AM - 8 PM ET); the mask is
+    # evaluated once instead of branching per bar
+    valid_idx = np.flatnonzero((hours >= 4) & (hours < 20))
+
+    # Process each trading-hour bar
+    for i in valid_idx:
+        # Pull scalars from the columns once, cast to native Python types so
+        # check_spike state and the saved JSON stay numpy-free
+        open_price = float(opens[i])
+        close_price = float(closes[i])
+        volume = int(volumes[i])
+        vwap = float(vwaps[i])
+        trade_count = int(trades[i])
+
+        # Precomputed ET timestamps (pd.Timestamp is a datetime)
+        dt = dt_index[i]
+        minute_ts = minute_index[i]
+
+        pct_change = float(pct_change_arr[i])
+
         # Setup minute_aggregates
         minute_aggregates[minute_ts][symbol] = {
-            'open': bar.open,
-            'high': bar.high,
-            'low': bar.low,
-            'close': bar.close,
-            'volume': bar.volume,
-            'value': bar.close * bar.volume,
-            'count': bar.transactions if hasattr(bar, 'transactions') else 100
+            'open': open_price,
+            'high': float(highs[i]),
+            'low': float(lows[i]),
+            'close': close_price,
+            'volume': volume,
+            'value': float(values_arr[i]),
+            'count': trade_count
         }
-        
+
         # Estimate spread (simplified - use 0.1% for liquid stocks)
-        mid_price = bar.close
         latest_quotes[symbol] = {
-            'bid': mid_price * 0.999,
-            'ask': mid_price * 1.001
+            'bid': close_price * 0.999,
+            'ask': close_price * 1.001
         }
-        
-        # Update rolling volume
-        if len(rolling_volume_3min[symbol]) >= 3:
-            rolling_volume_3min[symbol].pop(0)
-        rolling_volume_3min[symbol].append(bar.volume)
-        
+
+        # Shift the rolling 3-minute volume window in place (no O(n) pop(0))
+        vols[0] = vols[1]
+        vols[1] = vols[2]
+        vols[2] = volume
+
         # Check for breakout condition by examining if flag exists before and cleared after
         flag_before = symbol in momentum_flags
-        
+
         # Run check_spike
         check_spike(
             symbol=symbol,
             current_pct=pct_change,
-            current_vol=bar.volume,
+            current_vol=volume,
             minute_ts=minute_ts,
-            open_price=bar.open,
-            close_price=bar.close,
-            trade_count=bar.transactions if hasattr(bar, 'transactions') else 100,
+            open_price=open_price,
+            close_price=close_price,
+            trade_count=trade_count,
             vwap=vwap
         )
-        
+
         # If flag was set and now cleared, alert was triggered
         flag_after = symbol in momentum_flags
-        
+
         if flag_before and not flag_after:
             # Alert triggered! Simulate trade outcome
-            entry_price = bar.close
+            entry_price = close_price
             stop_loss = vwap * 0.98  # 2% below VWAP
             target = entry_price * 1.08  # 8% profit target
             
-            # Get future bars to simulate outcome
-            future_bars = bars[i+1:i+61]  # Next 60 minutes
-            
-            outcome = simulate_trading_outcome(entry_price, stop_loss, target, future_bars)
+            # Simulate outcome over the next 60 minutes of column data
+            outcome = simulate_trading_outcome(
+                entry_price, stop_loss, target,
+                highs[i+1:i+61], lows[i+1:i+61], closes[i+1:i+61])
             
             alert_data = {
                 'symbol': symbol,
@@ -271,7 +358,7 @@ def backtest_symbol(client, symbol, start_date, end_date, result):
                 'entry_price': entry_price,
                 'stop_loss': stop_loss,
                 'target': target,
-                'volume': bar.volume,
+                'volume': volume,
                 'pct_change': pct_change,
                 'outcome': outcome
             }
@@ -286,7 +373,21 @@ def backtest_symbol(client, symbol, start_date, end_date, result):
                       f"Exit: ${outcome['exit_price']:.2f} ({outcome['hit']}) | "
                       f"P/L: {outcome['profit_pct']:+.2f}% in {outcome['minutes_held']}min")
     
-    print(f"\n✓ Processed {len(bars)} bars, generated {alerts_generated} alerts")
+    print(f"\n✓ Processed {n_bars} bars, generated {alerts_generated} alerts")
+
+def _backtest_symbol_worker(args):
+    """Worker: backtest one symbol into a fresh BacktestResult. Builds its own
+    RESTClient (the client doesn't pickle) and owns process-local copies of the
+    check_spike module globals, so symbols can run in parallel without locking.
+    """
+    api_key, symbol, start_str, end_str = args
+    client = RESTClient(api_key)
+    partial = BacktestResult()
+    try:
+        backtest_symbol(client, symbol, start_str, end_str, partial)
+    except Exception as e:
+        print(f"❌ Error backtesting {symbol}: {e}")
+    return partial
 
 def backtest_from_csv(csv_file, result):
     """Backtest from CSV file if Polygon API is not available"""
@@ -315,25 +416,33 @@ def run_backtest(api_key, symbols, days_back=5):
     print(f"Period: Last {days_back} days")
     print("="*70)
     
-    # Initialize Polygon client
-    client = RESTClient(api_key)
-    
     # Calculate date range
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days_back)
-    
+
     start_str = start_date.strftime('%Y-%m-%d')
     end_str = end_date.strftime('%Y-%m-%d')
-    
-    # Run backtest for each symbol
+
+    # Run backtest for each symbol - symbols are independent (state is cleared
+    # per symbol), so fan out across worker processes and merge partials
     result = BacktestResult()
-    
-    for symbol in symbols:
-        try:
-            backtest_symbol(client, symbol, start_str, end_str, result)
-        except Exception as e:
-            print(f"❌ Error backtesting {symbol}: {e}")
-            continue
+    workers = min(BACKTEST_WORKERS, len(symbols))
+
+    if workers > 1:
+        print(f"🔀 Backtesting {len(symbols)} symbols across {workers} workers")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for partial in executor.map(
+                    _backtest_symbol_worker,
+                    [(api_key, sym, start_str, end_str) for sym in symbols]):
+                result.merge(partial)
+    else:
+        client = RESTClient(api_key)
+        for symbol in symbols:
+            try:
+                backtest_symbol(client, symbol, start_str, end_str, result)
+            except Exception as e:
+                print(f"❌ Error backtesting {symbol}: {e}")
+                continue
     
     # Calculate and display metrics
     result.calculate_metrics()
@@ -341,25 +450,31 @@ def run_backtest(api_key, symbols, days_back=5):
     
     # Save detailed results to JSON
     output_file = f"backtest_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(output_file, 'w') as f:
-        json.dump({
-            'backtest_config': {
-                'symbols': symbols,
-                'start_date': start_str,
-                'end_date': end_str,
-                'days_back': days_back
-            },
-            'summary': {
-                'total_alerts': result.total_alerts,
-                'profitable': result.profitable_alerts,
-                'losing': result.losing_alerts,
-                'win_rate': result.win_rate,
-                'avg_gain': result.avg_gain,
-                'max_gain': result.max_gain,
-                'max_loss': result.max_loss
-            },
-            'alerts': result.alerts
-        }, f, indent=2)
+    payload = {
+        'backtest_config': {
+            'symbols': symbols,
+            'start_date': start_str,
+            'end_date': end_str,
+            'days_back': days_back
+        },
+        'summary': {
+            'total_alerts': result.total_alerts,
+            'profitable': result.profitable_alerts,
+            'losing': result.losing_alerts,
+            'win_rate': result.win_rate,
+            'avg_gain': result.avg_gain,
+            'max_gain': result.max_gain,
+            'max_loss': result.max_loss
+        },
+        'alerts': result.alerts
+    }
+    if ORJSON_AVAILABLE:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(
+                payload, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(output_file, 'w') as f:
+            json.dump(payload, f, indent=2)
     
     print(f"\n💾 Detailed results saved to: {output_file}")
     
@@ -34,6 +34,12 @@ SUMMARY_PATH = RESULTS_DIR / 'cross_check_summary.json'
 # Helpers
 
 def load_expectations():
+    # Preferred: line-delimited records as written by expectation_builder
+    jsonl_path = EXPECT_PATH.with_suffix('.jsonl')
+    if jsonl_path.exists():
+        with open(jsonl_path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+    # Legacy consolidated file with a 'records' wrapper
     if not EXPECT_PATH.exists():
         raise FileNotFoundError(f"Expectation file not found: {EXPECT_PATH}")
     data = json.loads(EXPECT_PATH.read_text())
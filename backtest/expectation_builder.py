@@ -38,7 +38,36 @@ from __future__ import annotations
 import os, csv, gzip, json
 from datetime import datetime, timezone, timedelta
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import numpy as np
+import pandas as pd
+try:
+    from isal import igzip  # SIMD-accelerated inflate, drop-in for gzip
+    ISAL_AVAILABLE = True
+except ImportError:
+    ISAL_AVAILABLE = False
+try:
+    import orjson  # optional; C-speed encoder for the record stream
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+try:
+    import pyarrow  # noqa: F401 - enables the parquet flatfile sidecar cache
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+try:
+    os.environ.setdefault('NUMBA_CACHE_DIR',
+                          os.path.join(os.path.dirname(__file__), '.numba_cache'))
+    from numba import njit  # optional; the state machine runs as plain Python without it
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    def njit(*args, **kwargs):
+        def wrap(func):
+            return func
+        return wrap
 
 # Robust Eastern Time fallback (align with polygon_websocket)
 try:
@@ -70,10 +99,206 @@ SESSION_THRESHOLDS = {
                        min_rel_vol_stage1=2.3, min_rel_vol_stage2=4.0, watch_rel_vol=1.7, watch_pct=2.5)
 }
 
+# Worker processes for the per-day scan (1 = serial); same knob as the
+# backtest scripts
+EXPECT_WORKERS = int(os.getenv("BACKTEST_WORKERS", os.cpu_count() or 1))
+
 MIN_TRADES_STAGE1 = 3
 MIN_QUALITY_STAGE1 = 50.0  # align with polygon_websocket Stage1 gate
 MAX_STAGE1_CANDIDATES = 2   # allow up to two qualifying Stage1 minutes for tolerance
 
+# Threshold column order for the per-bar threshold rows fed to the kernel
+THR_KEYS = ('vol_thresh', 'spread_limit', 'pct_thresh_early', 'pct_thresh_confirm',
+            'min_rel_vol_stage1', 'min_rel_vol_stage2', 'watch_rel_vol', 'watch_pct')
+
+
+@njit(inline='always')
+def _quality_base(rel_vol, pct_change, volume, trades, vol_thresh):
+    """Shared quality components for the Stage1 gate and the Stage2 base
+    score (spread unavailable offline, hence the flat partial credit)."""
+    quality = (min(rel_vol, 8.0) / 8) * 28
+    quality += (min(abs(pct_change), 14.0) / 14) * 18
+    if vol_thresh > 0:
+        quality += (min(volume / vol_thresh, 2.0) / 2) * 14
+    quality += (min(trades / max(MIN_TRADES_STAGE1, 1), 3.0) / 3) * 12
+    quality += 5  # spread unknown partial credit
+    return quality
+
+
+@njit(cache=True)
+def _scan_state_machine(ts_ns, pct, rel_vol, vol_decl, volume, trades, close,
+                        prev_raw, thr):
+    """Sequential Watch/Setup/Confirm state machine over one symbol's
+    in-session bars, compiled to native code when numba is present.
+
+    All inputs are parallel arrays over the in-session bars; thr holds one
+    THR_KEYS-ordered threshold row per bar. Events are emitted into
+    preallocated arrays and returned trimmed: (bar index, stage, confirmation
+    code 0/1/2 = none/primary/alt, quality, stage1-candidate flag, setup
+    price, expansion pct, volume_sustained and acceleration as -1/0/1
+    tri-state). The caller materializes the JSON records.
+    """
+    m = ts_ns.shape[0]
+    cap = 2 * m + 2
+    ev_idx = np.empty(cap, np.int64)
+    ev_stage = np.empty(cap, np.int8)
+    ev_conf = np.empty(cap, np.int8)
+    ev_quality = np.empty(cap, np.float64)
+    ev_candidate = np.empty(cap, np.int8)
+    ev_setup_price = np.empty(cap, np.float64)
+    ev_expansion = np.empty(cap, np.float64)
+    ev_sustained = np.empty(cap, np.int8)
+    ev_accel = np.empty(cap, np.int8)
+    n_ev = 0
+
+    have_setup = False
+    setup_ts = np.int64(0)
+    setup_price = 0.0
+    setup_volume = 0.0
+    n_stage1 = 0
+    confirmed = False
+    # Loop/setup invariants, computed once instead of per bar
+    min_trades_stage2 = int(MIN_TRADES_STAGE1 * 1.1)
+    retrace_floor = 0.0
+    vol_sustained_floor = 0.0
+    alt_vol_floor = 0.0
+
+    for k in range(m):
+        vol_thresh = thr[k, 0]
+        pct_early = thr[k, 2]
+        pct_confirm = thr[k, 3]
+        rv1 = thr[k, 4]
+        rv2 = thr[k, 5]
+        rv = rel_vol[k]
+        pc = pct[k]
+        v = volume[k]
+        tr = trades[k]
+        cl = close[k]
+
+        # Stage0 (Watch) - accumulate until Stage1 appears
+        if (not have_setup) and rv >= thr[k, 6] and pc >= thr[k, 7] and tr >= 2:
+            ev_idx[n_ev] = k
+            ev_stage[n_ev] = 0
+            ev_conf[n_ev] = 0
+            ev_quality[n_ev] = 0.0
+            ev_candidate[n_ev] = 0
+            ev_setup_price[n_ev] = 0.0
+            ev_expansion[n_ev] = 0.0
+            ev_sustained[n_ev] = -1
+            ev_accel[n_ev] = -1
+            n_ev += 1
+
+        # Stage1 (Setup) with quality & decline gating
+        if not have_setup:
+            if (rv >= rv1 and pc >= pct_early and tr >= MIN_TRADES_STAGE1
+                    and not vol_decl[k]):
+                quality = _quality_base(rv, pc, v, tr, vol_thresh)
+                quality = round(quality, 1)
+                if quality > 100.0:
+                    quality = 100.0
+                if quality < 0.0:
+                    quality = 0.0
+                if quality >= MIN_QUALITY_STAGE1:
+                    n_stage1 += 1
+                    if n_stage1 == 1:
+                        have_setup = True
+                        setup_ts = ts_ns[k]
+                        setup_price = cl
+                        setup_volume = float(v)
+                        retrace_floor = setup_price * 0.985
+                        vol_sustained_floor = setup_volume * 0.5
+                        alt_vol_floor = setup_volume * 0.6
+                    if n_stage1 <= MAX_STAGE1_CANDIDATES:
+                        ev_idx[n_ev] = k
+                        ev_stage[n_ev] = 1
+                        ev_conf[n_ev] = 0
+                        ev_quality[n_ev] = quality
+                        ev_candidate[n_ev] = 1 if n_stage1 > 1 else 0
+                        ev_setup_price[n_ev] = setup_price
+                        ev_expansion[n_ev] = 0.0
+                        ev_sustained[n_ev] = -1
+                        ev_accel[n_ev] = -1
+                        n_ev += 1
+
+        # Stage2 (Confirmation) primary or alt with stricter parity to live logic
+        if have_setup and not confirmed:
+            minutes_since = ((ts_ns[k] - setup_ts) / 1e9) / 60.0
+            expansion_pct = ((cl - setup_price) / setup_price) * 100 if setup_price > 0 else 0.0
+            volume_sustained = v >= vol_sustained_floor
+            acceleration = rv >= (rv2 - 0.3 if expansion_pct >= 1.2 else rv2)
+            primary_pass = (pc >= pct_confirm and v >= vol_thresh * 0.85
+                            and acceleration and expansion_pct >= 0.5
+                            and volume_sustained
+                            and tr >= min_trades_stage2)
+            # Alt path parity adjustments: retrace, previous raw-minute volume
+            alt_pass = (not primary_pass and 2 <= minutes_since <= 3
+                        and expansion_pct >= 0.3 and pc >= pct_early + 0.5
+                        and volume_sustained and rv >= rv1 + 0.3
+                        and cl >= retrace_floor
+                        and v >= alt_vol_floor
+                        and prev_raw[k] >= vol_sustained_floor)
+            if primary_pass or alt_pass:
+                # Confirmation gate: same base model plus follow-through terms
+                quality = _quality_base(rv, pc, v, tr, vol_thresh)
+                # Expansion & follow-through
+                follow_components = 0.0
+                if expansion_pct >= 0.6:
+                    follow_components += min(expansion_pct / 6, 0.6)
+                if acceleration:
+                    follow_components += 0.3
+                if volume_sustained:
+                    follow_components += 0.3
+                follow_components = min(follow_components, 1.0)
+                quality += follow_components * 18
+                # Parabolic penalty
+                if pc >= 11 and not volume_sustained:
+                    quality -= (min(pc - 11, 6.0) / 6) * 6
+                quality = round(quality, 1)
+                if quality > 100.0:
+                    quality = 100.0
+                if quality < 0.0:
+                    quality = 0.0
+                min_gate = 60.0 if primary_pass else 58.0
+                if quality >= min_gate:
+                    ev_idx[n_ev] = k
+                    ev_stage[n_ev] = 2
+                    ev_conf[n_ev] = 1 if primary_pass else 2
+                    ev_quality[n_ev] = quality
+                    ev_candidate[n_ev] = 0
+                    ev_setup_price[n_ev] = setup_price
+                    ev_expansion[n_ev] = expansion_pct
+                    ev_sustained[n_ev] = 1 if volume_sustained else 0
+                    ev_accel[n_ev] = 1 if acceleration else 0
+                    n_ev += 1
+                    confirmed = True
+                    # No further confirmations for this symbol-day
+
+    return (ev_idx[:n_ev], ev_stage[:n_ev], ev_conf[:n_ev], ev_quality[:n_ev],
+            ev_candidate[:n_ev], ev_setup_price[:n_ev], ev_expansion[:n_ev],
+            ev_sustained[:n_ev], ev_accel[:n_ev])
+
+
+# Session codes: index into SESSION_NAMES; 3 = CLOSED (never scanned)
+SESSION_NAMES = ('PREMARKET', 'REGULAR', 'POSTMARKET', 'CLOSED')
+
+# SESSION_THRESHOLDS flattened to a float64 matrix: one row per session code,
+# one column per THR_KEYS entry, so per-bar lookup is a single fancy index
+# instead of two dict probes per threshold
+THR_TABLE = np.array([[SESSION_THRESHOLDS[s][key] for key in THR_KEYS]
+                      for s in SESSION_NAMES[:3]], dtype=np.float64)
+
+
+def classify_sessions(dt_index) -> np.ndarray:
+    """Vectorized session classification: minute-of-day boundaries over a
+    tz-converted DatetimeIndex, one int8 code per bar."""
+    mod = dt_index.hour.to_numpy() * 60 + dt_index.minute.to_numpy()
+    codes = np.full(mod.shape[0], 3, dtype=np.int8)
+    codes[(mod >= 4 * 60) & (mod < 9 * 60 + 30)] = 0   # PREMARKET
+    codes[(mod >= 9 * 60 + 30) & (mod < 16 * 60)] = 1  # REGULAR
+    codes[(mod >= 16 * 60) & (mod < 20 * 60)] = 2      # POSTMARKET
+    return codes
+
+
 # Simple utility to classify session by hour (Eastern)
 def classify_session(dt: datetime) -> str:
     h = dt.hour
@@ -103,227 +328,253 @@ def read_tickers() -> set[str]:
     return tickers
 
 
+# Columns the scan actually consumes; high/low are skipped at parse time
+FLATFILE_USECOLS = ['ticker', 'window_start', 'open', 'close', 'volume', 'transactions']
+FLATFILE_DTYPES = {'ticker': 'category', 'window_start': np.int64, 'open': np.float64,
+                   'close': np.float64, 'volume': np.int64, 'transactions': np.int64}
+
+
+def _read_csv_gz(path: Path, **kwargs) -> pd.DataFrame:
+    """read_csv a gzipped file, decompressing through ISA-L when python-isal
+    is installed (2-4x faster inflate than zlib); stdlib gzip otherwise."""
+    if ISAL_AVAILABLE:
+        with igzip.open(path, 'rb') as fh:
+            return pd.read_csv(fh, **kwargs)
+    return pd.read_csv(path, compression='gzip', **kwargs)
+
+
+def _load_flatfile_frame(path: Path) -> pd.DataFrame:
+    """Column-pruned full-day frame for one flatfile, with a .parquet sidecar
+    next to the gz so repeat runs skip decompression and CSV parsing. The
+    cache is written before any ticker filtering, so one sidecar serves any
+    watchlist; it is rebuilt whenever the gz is newer (re-downloaded)."""
+    cache_path = path.with_suffix('.parquet')
+    if (PYARROW_AVAILABLE and cache_path.exists()
+            and cache_path.stat().st_mtime >= path.stat().st_mtime):
+        return pd.read_parquet(cache_path)
+    try:
+        df = _read_csv_gz(path, usecols=FLATFILE_USECOLS, dtype=FLATFILE_DTYPES)
+    except ValueError:
+        # Older flatfiles lack the transactions column
+        df = _read_csv_gz(path, usecols=FLATFILE_USECOLS[:-1],
+                          dtype={k: v for k, v in FLATFILE_DTYPES.items()
+                                 if k != 'transactions'})
+        df['transactions'] = 0
+    if PYARROW_AVAILABLE:
+        try:
+            df.to_parquet(cache_path, compression='zstd')
+        except Exception as e:
+            print(f"[WARN] Could not write parquet cache {cache_path.name}: {e}")
+    return df
+
+
 def parse_flatfile(path: Path, ticker_set: set[str]):
-    bars_by_symbol = defaultdict(list)
-    with gzip.open(path, 'rt') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            sym = row['ticker']
-            if sym not in ticker_set:  # filter only monitored tickers
-                continue
-            ts_ns = int(row['window_start'])
-            # Convert via UTC then to Eastern to respect DST
-            ts_utc = datetime.fromtimestamp(ts_ns / 1_000_000_000, tz=timezone.utc)
-            ts = ts_utc.astimezone(ET)
-            bar = dict(
-                symbol=sym,
-                timestamp=ts,
-                open=float(row['open']),
-                close=float(row['close']),
-                high=float(row['high']),
-                low=float(row['low']),
-                volume=int(row['volume']),
-                trades=int(row.get('transactions', 0)),
-            )
-            bars_by_symbol[sym].append(bar)
-    for sym in bars_by_symbol:
-        bars_by_symbol[sym].sort(key=lambda b: b['timestamp'])
+    """Read one day's flatfile into per-symbol parallel NumPy arrays (SoA).
+
+    Returns {symbol: {'ts_ns', 'open', 'close', 'volume', 'trades'}}, each a
+    contiguous array sorted by timestamp. pandas' C tokenizer parses and
+    type-converts whole columns at once instead of building a dict per row,
+    and one stable frame-level sort replaces the per-symbol Python sorts.
+    """
+    df = _load_flatfile_frame(path)
+    df = df[df['ticker'].isin(ticker_set)]
+    if df.empty:
+        return {}
+    df = df.sort_values(['ticker', 'window_start'], kind='stable')
+    bars_by_symbol = {}
+    for sym, group in df.groupby('ticker', sort=False, observed=True):
+        bars_by_symbol[sym] = {
+            'ts_ns': group['window_start'].to_numpy(),
+            'open': group['open'].to_numpy(),
+            'close': group['close'].to_numpy(),
+            'volume': group['volume'].to_numpy(),
+            'trades': group['transactions'].to_numpy(),
+        }
     return bars_by_symbol
 
 
+def scan_flatfile(fp: Path, ticker_set) -> list:
+    """Derive all expectation records for a single day's flatfile."""
+    raw_stem = fp.stem  # e.g. '2025-10-24.csv'
+    date_str = raw_stem.replace('.csv', '')  # normalize to '2025-10-24'
+    print(f"[SCAN] {date_str}")
+    expectations = []
+    bars_by_symbol = parse_flatfile(fp, ticker_set)
+    for symbol, cols in bars_by_symbol.items():
+        opens = cols['open']
+        closes = cols['close']
+        volumes = cols['volume']
+        trades_arr = cols['trades']
+        # One vectorized UTC->Eastern conversion for the whole symbol
+        dt_index = pd.to_datetime(cols['ts_ns'], utc=True).tz_convert(ET)
+        session_codes = classify_sessions(dt_index)
+        # Percent change open->close for every bar in one fused pass
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct_arr = np.where(opens > 0, (closes - opens) / opens * 100.0, 0.0)
+        # Raw previous-row volume: the alt confirmation looks one raw bar
+        # back (session-filtered or not), matching the old list indexing
+        prev_raw_vol = np.empty_like(volumes)
+        prev_raw_vol[0] = 0
+        prev_raw_vol[1:] = volumes[:-1]
+        # In-session bars only; CLOSED bars never touched the rolling
+        # window before either
+        open_idx = np.flatnonzero(session_codes != 3)
+        if open_idx.size == 0:
+            continue
+        # Rolling 3-minute relative volume (mean of previous up-to-3
+        # in-session volumes, 1 when no history) in one vectorized pass
+        vols_open = pd.Series(volumes[open_idx], dtype=np.float64)
+        prev_avg_arr = vols_open.shift(1).rolling(3, min_periods=1).mean().fillna(1.0).to_numpy()
+        vols_open_arr = vols_open.to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rel_vol_arr = np.where(prev_avg_arr > 0, vols_open_arr / prev_avg_arr, 0.0)
+        prev_open_vol = np.concatenate(([0.0], vols_open_arr[:-1]))
+        # Volume decline flag (mirror polygon logic threshold 40%)
+        vol_declining_arr = (prev_open_vol > 0) & (vols_open_arr < prev_open_vol * 0.4)
+
+        # One THR_KEYS-ordered threshold row per in-session bar
+        thr = THR_TABLE[session_codes[open_idx]]
+
+        (ev_idx, ev_stage, ev_conf, ev_quality, ev_candidate,
+         ev_setup_price, ev_expansion, ev_sustained, ev_accel) = _scan_state_machine(
+            cols['ts_ns'][open_idx], pct_arr[open_idx], rel_vol_arr,
+            vol_declining_arr, volumes[open_idx], trades_arr[open_idx],
+            closes[open_idx], prev_raw_vol[open_idx], thr)
+
+        # Round the emitted columns in one C pass each instead of a Python
+        # round() per event field
+        ev_pct = np.round(pct_arr[open_idx[ev_idx]], 3)
+        ev_rel_vol = np.round(rel_vol_arr[ev_idx], 3)
+        ev_setup_r = np.round(ev_setup_price, 4)
+        ev_expansion_r = np.round(ev_expansion, 3)
+
+        # Materialize JSON records only for the (sparse) emitted events
+        for e in range(ev_idx.shape[0]):
+            i = int(open_idx[ev_idx[e]])
+            dt = dt_index[i]
+            session = SESSION_NAMES[session_codes[i]]
+            stage = int(ev_stage[e])
+            pct_change = float(ev_pct[e])
+            rel_vol = float(ev_rel_vol[e])
+            bar_volume = int(volumes[i])
+            bar_trades = int(trades_arr[i])
+            if stage == 0:
+                expectations.append({
+                    'symbol': symbol,
+                    'date': date_str,
+                    'minute_ts': dt.isoformat(),
+                    'stage_expected': 0,
+                    'confirmation_type': None,
+                    'session': session,
+                    'pct_change': pct_change,
+                    'rel_vol': rel_vol,
+                    'volume': bar_volume,
+                    'trades': bar_trades,
+                    'setup_price': None,
+                    'expansion_pct': None,
+                    'volume_sustained': None,
+                    'acceleration': None,
+                    'reason_flags': ['watch_thresholds']
+                })
+            elif stage == 1:
+                expectations.append({
+                    'symbol': symbol,
+                    'date': date_str,
+                    'minute_ts': dt.isoformat(),
+                    'stage_expected': 1,
+                    'confirmation_type': None,
+                    'session': session,
+                    'pct_change': pct_change,
+                    'rel_vol': rel_vol,
+                    'volume': bar_volume,
+                    'trades': bar_trades,
+                    'setup_price': float(ev_setup_r[e]),
+                    'expansion_pct': 0.0,
+                    'volume_sustained': None,
+                    'acceleration': None,
+                    'reason_flags': ['stage1_thresholds',
+                                     'candidate' if ev_candidate[e] else 'primary',
+                                     f'quality={float(ev_quality[e])}']
+                })
+            else:
+                confirmation_type = 'primary' if ev_conf[e] == 1 else 'alt'
+                expectations.append({
+                    'symbol': symbol,
+                    'date': date_str,
+                    'minute_ts': dt.isoformat(),
+                    'stage_expected': 2,
+                    'confirmation_type': confirmation_type,
+                    'session': session,
+                    'pct_change': pct_change,
+                    'rel_vol': rel_vol,
+                    'volume': bar_volume,
+                    'trades': bar_trades,
+                    'setup_price': float(ev_setup_r[e]),
+                    'expansion_pct': float(ev_expansion_r[e]),
+                    'volume_sustained': bool(ev_sustained[e]),
+                    'acceleration': bool(ev_accel[e]),
+                    'reason_flags': ['stage2_' + confirmation_type,
+                                     f'quality={float(ev_quality[e])}']
+                })
+
+    return expectations
+
+
+def _scan_one_day(args):
+    """Worker wrapper: days are independent, so each process scans one
+    flatfile and ships its records back for a simple list merge."""
+    return scan_flatfile(*args)
+
+
 def build_expectations():
-    tickers = read_tickers()
+    """Yield expectation records day by day so the caller can stream them;
+    only one day's records are ever held in memory at a time."""
+    tickers = frozenset(read_tickers())
     flatfiles = sorted(FLATFILES_DIR.glob('*.csv.gz'))
     if not flatfiles:
         print(f"[ERROR] No flatfiles found in {FLATFILES_DIR}")
-        return []
-    expectations = []
-    for fp in flatfiles:
-        raw_stem = fp.stem  # e.g. '2025-10-24.csv'
-        date_str = raw_stem.replace('.csv', '')  # normalize to '2025-10-24'
-        print(f"[SCAN] {date_str}")
-        bars_by_symbol = parse_flatfile(fp, tickers)
-        for symbol, bars in bars_by_symbol.items():
-            # Rolling 3-minute volume window for rel_vol (average of previous 3 completed minutes)
-            rolling_vol = []  # maintain last up to 3 volumes
-            setup_flag = None  # dict capturing setup context
-            stage1_minutes = []  # record multiple stage1 candidate minutes (up to limit)
-            watch_minutes = []  # record multiple watch minutes until setup
-            confirmed = False
-            for i, bar in enumerate(bars):
-                dt = bar['timestamp']
-                session = classify_session(dt)
-                if session == 'CLOSED':
-                    continue
-                cfg = SESSION_THRESHOLDS[session]
-                # percent change open->close
-                pct_change = ((bar['close'] - bar['open']) / bar['open']) * 100 if bar['open'] > 0 else 0
-                # rel_vol (current volume divided by mean of rolling_vol) using previous 3 minutes only
-                prev_avg = (sum(rolling_vol) / len(rolling_vol)) if rolling_vol else 1
-                rel_vol = bar['volume'] / prev_avg if prev_avg > 0 else 0
-                prev_minute_vol = rolling_vol[-1] if rolling_vol else 0  # for decline & alt volume checks
-                # Update rolling AFTER computing rel_vol for this minute
-                rolling_vol.append(bar['volume'])
-                if len(rolling_vol) > 3:
-                    rolling_vol.pop(0)
-                reason_flags = []
-                # Volume decline flag (mirror polygon logic threshold 40%)
-                vol_declining = prev_minute_vol > 0 and bar['volume'] < prev_minute_vol * 0.4
-
-                # Stage0 (Watch) expectation - accumulate until Stage1 appears
-                if (setup_flag is None and rel_vol >= cfg['watch_rel_vol'] and pct_change >= cfg['watch_pct']
-                        and bar['trades'] >= 2):
-                    watch_minutes.append(dt)
-                    expectations.append({
-                        'symbol': symbol,
-                        'date': date_str,
-                        'minute_ts': dt.isoformat(),
-                        'stage_expected': 0,
-                        'confirmation_type': None,
-                        'session': session,
-                        'pct_change': round(pct_change, 3),
-                        'rel_vol': round(rel_vol, 3),
-                        'volume': bar['volume'],
-                        'trades': bar['trades'],
-                        'setup_price': None,
-                        'expansion_pct': None,
-                        'volume_sustained': None,
-                        'acceleration': None,
-                        'reason_flags': ['watch_thresholds']
-                    })
-
-                # Stage1 (Setup) with quality & decline gating
-                if setup_flag is None:
-                    stage1_thresholds_pass = (rel_vol >= cfg['min_rel_vol_stage1'] and pct_change >= cfg['pct_thresh_early']
-                                              and bar['trades'] >= MIN_TRADES_STAGE1 and not vol_declining)
-                    if stage1_thresholds_pass:
-                        # Compute crude quality score (spread unavailable -> partial credit)
-                        # Re-use weighting approximations from polygon (simplified inline)
-                        # Relative volume component (cap at 8x)
-                        rel_vol_capped = min(rel_vol, 8)
-                        quality = (rel_vol_capped / 8) * 28
-                        pct_capped = min(abs(pct_change), 14)
-                        quality += (pct_capped / 14) * 18
-                        if cfg['vol_thresh'] > 0:
-                            vol_ratio = min(bar['volume'] / cfg['vol_thresh'], 2)
-                            quality += (vol_ratio / 2) * 14
-                        trade_ratio = min(bar['trades'] / max(MIN_TRADES_STAGE1, 1), 3)
-                        quality += (trade_ratio / 3) * 12
-                        quality += 5  # spread unknown partial credit
-                        # No expansion yet
-                        quality = max(0, min(round(quality, 1), 100))
-                        if quality >= MIN_QUALITY_STAGE1:
-                            stage1_minutes.append(dt)
-                            if len(stage1_minutes) == 1:
-                                setup_flag = dict(time=dt, price=bar['close'], volume=bar['volume'])
-                            if len(stage1_minutes) <= MAX_STAGE1_CANDIDATES:
-                                expectations.append({
-                                    'symbol': symbol,
-                                    'date': date_str,
-                                    'minute_ts': dt.isoformat(),
-                                    'stage_expected': 1,
-                                    'confirmation_type': None,
-                                    'session': session,
-                                    'pct_change': round(pct_change, 3),
-                                    'rel_vol': round(rel_vol, 3),
-                                    'volume': bar['volume'],
-                                    'trades': bar['trades'],
-                                    'setup_price': round(stage1_minutes[0] == dt and bar['close'] or setup_flag['price'], 4),
-                                    'expansion_pct': 0.0,
-                                    'volume_sustained': None,
-                                    'acceleration': None,
-                                    'reason_flags': ['stage1_thresholds', 'candidate' if len(stage1_minutes) > 1 else 'primary', f'quality={quality}']
-                                })
-                        else:
-                            reason_flags.append('quality_gate_failed')
-
-                # Stage2 (Confirmation) primary or alt with stricter parity to live logic
-                if setup_flag and not confirmed:
-                    minutes_since = (dt - setup_flag['time']).total_seconds() / 60.0
-                    expansion_pct = ((bar['close'] - setup_flag['price']) / setup_flag['price']) * 100 if setup_flag['price'] > 0 else 0
-                    volume_sustained = bar['volume'] >= setup_flag['volume'] * 0.5
-                    acceleration = rel_vol >= (cfg['min_rel_vol_stage2'] - 0.3 if expansion_pct >= 1.2 else cfg['min_rel_vol_stage2'])
-                    primary_pass = (pct_change >= cfg['pct_thresh_confirm'] and bar['volume'] >= cfg['vol_thresh'] * 0.85
-                                    and acceleration and expansion_pct >= 0.5 and volume_sustained and bar['trades'] >= int(MIN_TRADES_STAGE1 * 1.1))
-                    # Alt path parity adjustments: retrace, previous minute volume checks
-                    alt_pass = False
-                    prev_minute_volume_for_alt = bars[i-1]['volume'] if i > 0 else 0
-                    retrace_ok = bar['close'] >= setup_flag['price'] * 0.985
-                    alt_volume_ok = (bar['volume'] >= setup_flag['volume'] * 0.6) and (prev_minute_volume_for_alt >= setup_flag['volume'] * 0.5)
-                    if (not primary_pass and 2 <= minutes_since <= 3 and expansion_pct >= 0.3
-                            and pct_change >= (cfg['pct_thresh_early'] + 0.5)
-                            and volume_sustained and rel_vol >= (cfg['min_rel_vol_stage1'] + 0.3)
-                            and retrace_ok and alt_volume_ok):
-                        alt_pass = True
-                    if primary_pass or alt_pass:
-                        # Compute confirmation quality gate (reuse simplified model)
-                        rel_vol_capped = min(rel_vol, 8)
-                        quality = (rel_vol_capped / 8) * 28
-                        pct_capped = min(abs(pct_change), 14)
-                        quality += (pct_capped / 14) * 18
-                        if cfg['vol_thresh'] > 0:
-                            vol_ratio = min(bar['volume'] / cfg['vol_thresh'], 2)
-                            quality += (vol_ratio / 2) * 14
-                        trade_ratio = min(bar['trades'] / max(MIN_TRADES_STAGE1, 1), 3)
-                        quality += (trade_ratio / 3) * 12
-                        quality += 5  # spread unknown partial credit
-                        # Expansion & follow-through
-                        follow_components = 0.0
-                        if expansion_pct >= 0.6:
-                            follow_components += min(expansion_pct / 6, 0.6)
-                        if acceleration:
-                            follow_components += 0.3
-                        if volume_sustained:
-                            follow_components += 0.3
-                        follow_components = min(follow_components, 1.0)
-                        quality += follow_components * 18
-                        # Parabolic penalty
-                        if pct_change >= 11 and not volume_sustained:
-                            excess = min(pct_change - 11, 6)
-                            quality -= (excess / 6) * 6
-                        quality = max(0, min(round(quality, 1), 100))
-                        min_gate = 60 if primary_pass else 58
-                        if quality < min_gate:
-                            reason_flags.append('stage2_quality_gate_failed')
-                        else:
-                            confirmation_type = 'primary' if primary_pass else 'alt'
-                            expectations.append({
-                                'symbol': symbol,
-                                'date': date_str,
-                                'minute_ts': dt.isoformat(),
-                                'stage_expected': 2,
-                                'confirmation_type': confirmation_type,
-                                'session': session,
-                                'pct_change': round(pct_change, 3),
-                                'rel_vol': round(rel_vol, 3),
-                                'volume': bar['volume'],
-                                'trades': bar['trades'],
-                                'setup_price': round(setup_flag['price'], 4),
-                                'expansion_pct': round(expansion_pct, 3),
-                                'volume_sustained': volume_sustained,
-                                'acceleration': acceleration,
-                                'reason_flags': ['stage2_' + confirmation_type, f'quality={quality}']
-                            })
-                            confirmed = True
-                            # No further confirmations for this symbol-day
-
-    return expectations
+        return
+    if EXPECT_WORKERS > 1 and len(flatfiles) > 1:
+        workers = min(EXPECT_WORKERS, len(flatfiles))
+        print(f"[INFO] Scanning {len(flatfiles)} days across {workers} processes")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for day_records in pool.map(_scan_one_day,
+                                        [(fp, tickers) for fp in flatfiles]):
+                yield from day_records
+    else:
+        for fp in flatfiles:
+            yield from scan_flatfile(fp, tickers)
 
 
 def main():
-    expectations = build_expectations()
-    if not expectations:
+    # Line-delimited JSON: each record is written as soon as its day is
+    # scanned instead of buffering the whole run for one indented dump
+    output_jsonl = OUTPUT_PATH.with_suffix('.jsonl')
+    count = 0
+    stage_counts = defaultdict(int)
+    if ORJSON_AVAILABLE:
+        with open(output_jsonl, 'wb') as f:
+            for rec in build_expectations():
+                f.write(orjson.dumps(rec))
+                f.write(b'\n')
+                stage_counts[rec['stage_expected']] += 1
+                count += 1
+    else:
+        with open(output_jsonl, 'w') as f:
+            for rec in build_expectations():
+                f.write(json.dumps(rec))
+                f.write('\n')
+                stage_counts[rec['stage_expected']] += 1
+                count += 1
+    if count == 0:
         print('[DONE] No expectations generated.')
         return
-    with open(OUTPUT_PATH, 'w') as f:
-        json.dump({'generated_at': datetime.utcnow().isoformat() + 'Z',
-                   'count': len(expectations),
-                   'records': expectations}, f, indent=2)
-    print(f"[OK] Wrote {len(expectations)} expectation records -> {OUTPUT_PATH}")
-    # Quick summary stats
-    stage_counts = defaultdict(int)
-    for r in expectations:
-        stage_counts[r['stage_expected']] += 1
+    # Small metadata sidecar replacing the old wrapper object
+    with open(OUTPUT_PATH.with_suffix('.meta.json'), 'w') as f:
+        json.dump({'generated_at': datetime.now(timezone.utc).isoformat(),
+                   'count': count,
+                   'records_file': output_jsonl.name}, f, indent=2)
+    print(f"[OK] Wrote {count} expectation records -> {output_jsonl}")
     print('[SUMMARY] Stage counts:', dict(stage_counts))
 
 if __name__ == '__main__':
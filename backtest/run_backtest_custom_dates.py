@@ -21,6 +21,7 @@ os.environ["BACKTEST_MODE"] = "1"  # Enable relaxed thresholds for backtesting
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from backtest_flatfiles import (
     parse_flat_file, backtest_symbol, load_tickers,
     BacktestResult, CACHE_DIR
@@ -33,6 +34,40 @@ import polygon_websocket as ws
 rejection_stats = defaultdict(int)
 momentum_counter_stats = []
 
+BACKTEST_WORKERS = int(os.environ.get("BACKTEST_WORKERS", os.cpu_count() or 1))
+
+
+def _init_worker():
+    """Give each worker process its own copy of the adaptive-threshold
+    statistics (module-level state in polygon_websocket)"""
+    ws.load_historical_stats()
+
+
+def _process_date(args):
+    """Worker: backtest one date's flat file into a fresh BacktestResult.
+    Detection state (momentum counters, rolling volume) is process-local,
+    so dates run independently; the parent just merges the partials."""
+    date_str, tickers = args
+    file_path = CACHE_DIR / f"{date_str}.csv.gz"
+
+    if not file_path.exists():
+        print(f"[SKIP] {date_str} - file not found")
+        return None
+
+    print(f"\nProcessing {date_str}.csv...")
+
+    partial = BacktestResult()
+    bars_by_symbol = parse_flat_file(file_path, tickers)
+
+    total_bars = 0
+    for symbol, bars in bars_by_symbol.items():
+        total_bars += len(bars)
+        backtest_symbol(symbol, bars, partial)
+
+    partial.total_bars = total_bars
+    print(f"  Processed {total_bars:,} bars, {len(bars_by_symbol)} symbols")
+    return partial
+
 def run_custom_backtest():
     """Run backtest with your specific downloaded dates"""
     
@@ -69,28 +104,23 @@ def run_custom_backtest():
     # Initialize result
     result = BacktestResult()
     result.total_bars = 0  # Track total bars processed
-    
-    # Process each date
-    for date_str in dates:
-        file_path = CACHE_DIR / f"{date_str}.csv.gz"
-        
-        if not file_path.exists():
-            print(f"[SKIP] {date_str} - file not found")
+
+    # Each date is independent (decompress + parse + detect), so fan the
+    # days out across worker processes and merge the partial results
+    date_args = [(date_str, tickers) for date_str in dates]
+    if BACKTEST_WORKERS > 1 and len(dates) > 1:
+        workers = min(BACKTEST_WORKERS, len(dates))
+        print(f"[PARALLEL] Backtesting {len(dates)} days across {workers} workers")
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            partials = list(pool.map(_process_date, date_args))
+    else:
+        partials = [_process_date(args) for args in date_args]
+
+    for partial in partials:
+        if partial is None:
             continue
-        
-        print(f"\nProcessing {date_str}.csv...")
-        
-        # Parse bars
-        bars_by_symbol = parse_flat_file(file_path, tickers)
-        
-        # Process each symbol's bars
-        total_bars = 0
-        for symbol, bars in bars_by_symbol.items():
-            total_bars += len(bars)
-            backtest_symbol(symbol, bars, result)
-        
-        result.total_bars += total_bars
-        print(f"  Processed {total_bars:,} bars, {len(bars_by_symbol)} symbols")
+        result.merge(partial)
+        result.total_bars += partial.total_bars
     
     # Print summary
     print("\n" + "="*80)
@@ -12,7 +12,9 @@ Usage:
 import os
 import sys
 import gzip
+import threading
 import boto3
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
 from botocore.config import Config
@@ -28,6 +30,7 @@ ACCESS_KEY_ID = "beea43df-4b8b-4a9a-87e5-2029718458da"
 SECRET_ACCESS_KEY = "lODb71RE6pKs8Vd7HVxUo3u2Up26o14S"
 S3_ENDPOINT = "https://files.massive.com"
 S3_BUCKET = "flatfiles"
+DOWNLOAD_THREADS = 8
 
 def download_flatfile(s3_client, date_obj, output_dir, s3_prefix):
     """Download flatfile for a specific date from S3"""
@@ -58,14 +61,17 @@ def download_flatfile(s3_client, date_obj, output_dir, s3_prefix):
     # Use a temporary file to avoid partial downloads
     temp_file = output_dir / f"{date_str}.csv.gz.tmp"
     
-    # Track download progress
+    # Track download progress; the multipart worker threads call this
+    # concurrently, so the byte counter takes a lock
     class ProgressTracker:
         def __init__(self):
             self.size = 0
-        
+            self._lock = threading.Lock()
+
         def __call__(self, bytes_amount):
-            self.size += bytes_amount
-            mb = self.size / (1024 * 1024)
+            with self._lock:
+                self.size += bytes_amount
+                mb = self.size / (1024 * 1024)
             print(f"\r[DOWNLOAD] {date_str}... {mb:.1f} MB", end="", flush=True)
     
     progress = ProgressTracker()
@@ -77,7 +83,12 @@ def download_flatfile(s3_client, date_obj, output_dir, s3_prefix):
             s3_key, 
             str(temp_file),
             Callback=progress,
-            Config=boto3.s3.transfer.TransferConfig(use_threads=False)
+            # Ranged multipart GET: fetch 8 MB chunks on 8 threads instead of
+            # one serial stream, which a 20 MB minute file never saturates
+            Config=boto3.s3.transfer.TransferConfig(
+                use_threads=True, max_concurrency=8,
+                multipart_threshold=8 * 1024 * 1024,
+                multipart_chunksize=8 * 1024 * 1024)
         )
         
         print(" [VERIFYING]...", end="", flush=True)
@@ -158,9 +169,7 @@ def main():
     # Calculate date range (skip today, start from yesterday)
     end_date = datetime.now() - timedelta(days=1)
     
-    successful = 0
-    failed = 0
-    
+    weekdays = []
     for i in range(args.days):
         date_obj = end_date - timedelta(days=i)
         
@@ -168,11 +177,22 @@ def main():
         if date_obj.weekday() >= 5:
             print(f"[SKIP] {date_obj.strftime('%Y-%m-%d')}: Weekend")
             continue
-        
-        if download_flatfile(s3_client, date_obj, output_dir, s3_prefix):
-            successful += 1
-        else:
-            failed += 1
+        weekdays.append(date_obj)
+
+    successful = 0
+    failed = 0
+
+    # Each date is an independent file, so overlap the S3 GETs across a
+    # thread pool (boto3 clients are thread-safe; sockets release the GIL)
+    if weekdays:
+        with ThreadPoolExecutor(max_workers=min(DOWNLOAD_THREADS, len(weekdays))) as pool:
+            futures = [pool.submit(download_flatfile, s3_client, date_obj, output_dir, s3_prefix)
+                       for date_obj in weekdays]
+            for future in as_completed(futures):
+                if future.result():
+                    successful += 1
+                else:
+                    failed += 1
     
     print()
     print("="*80)
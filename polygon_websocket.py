@@ -42,6 +42,19 @@ except Exception:
         ET_TIMEZONE = timezone(timedelta(hours=-5))  # Approximate EST without DST handling
         print("[WARN] Using fixed-offset timezone fallback for Eastern Time")
 
+# Shared keep-alive HTTP session for the REST side calls (news lookups,
+# Telegram sends). These fire on every alert, and reusing pooled connections
+# skips a fresh TCP+TLS handshake per call.
+_http_session = requests.Session()
+try:
+    from urllib3.util.retry import Retry
+    _http_session.mount('https://', requests.adapters.HTTPAdapter(
+        pool_connections=32, pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.2,
+                          status_forcelist=[429, 500, 502, 503, 504])))
+except Exception:
+    pass  # default adapter still pools a few connections
+
 # Configuration
 DISABLE_NOTIFICATIONS = os.getenv("DISABLE_NOTIFICATIONS", "0") == "1"  # Set env var to suppress Telegram sends
 STAGE2_DEBUG = os.getenv("STAGE2_DEBUG", "0") == "1"  # Enable detailed Stage 2 diagnostic logging
@@ -159,18 +172,29 @@ def read_tickers(filepath):
         candidates.append(legacy)
     for path in candidates:
         if os.path.exists(path):
-            tickers = []
+            tickers = None
             try:
-                with open(path, 'r') as f:
-                    for row in csv.reader(f):
-                        if row:
-                            ticker = row[0].strip().upper()
-                            if ticker and ticker != "SYMBOL":
-                                tickers.append(ticker)
-                print(f"✓ Loaded {len(tickers)} tickers from {path}")
-            except Exception as e:
-                print(f"Error reading tickers from {path}: {e}")
-                return []
+                # Fast path: pandas' C tokenizer + vectorized string ops,
+                # matters for multi-thousand-symbol universes
+                import pandas as pd
+                col = pd.read_csv(path, header=None, usecols=[0], dtype=str).iloc[:, 0]
+                col = col.dropna().str.strip().str.upper()
+                tickers = [t for t in col.tolist() if t and t != "SYMBOL"]
+            except Exception:
+                pass  # pandas missing or parse quirk - use the stdlib reader
+            if tickers is None:
+                tickers = []
+                try:
+                    with open(path, 'r') as f:
+                        for row in csv.reader(f):
+                            if row:
+                                ticker = row[0].strip().upper()
+                                if ticker and ticker != "SYMBOL":
+                                    tickers.append(ticker)
+                except Exception as e:
+                    print(f"Error reading tickers from {path}: {e}")
+                    return []
+            print(f"✓ Loaded {len(tickers)} tickers from {path}")
             return tickers
     print(f"⚠️ Ticker file not found. Checked: {candidates}. Set TICKER_FILE env var if custom path needed.")
     return []
@@ -205,7 +229,7 @@ def fetch_recent_news(symbol, limit=1):
             'apiKey': API_KEY
         }
         
-        response = requests.get(url, params=params, timeout=5)
+        response = _http_session.get(url, params=params, timeout=5)
         
         if response.status_code == 200:
             data = response.json()
@@ -273,7 +297,7 @@ def send_telegram(message):
         
         for chat_id in chat_ids:
             try:
-                response = requests.post(
+                response = _http_session.post(
                     url,
                     data={'chat_id': chat_id, 'text': message, 'parse_mode': 'HTML'},
                     timeout=30  # Increased from 10 to 30 seconds
@@ -147,60 +147,44 @@ def calculate_stats(tickers):
         
         print(f"[OK] {len(daily_stats)} symbols")
     
-    # Calculate averages
-    print(f"\n[STATS] Calculating averages...")
-    results = []
-    
-    for symbol in tickers:
-        if symbol not in symbol_data:
-            # No data for this symbol
-            results.append({
-                'symbol': symbol,
-                'avg_volume_20d': '',
-                'avg_range_20d': '',
-                'bars_count': 0,
-                'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            })
-            continue
-        
-        volumes = symbol_data[symbol]['volumes']
-        ranges = symbol_data[symbol]['ranges']
-        
-        if not volumes:
-            results.append({
-                'symbol': symbol,
-                'avg_volume_20d': '',
-                'avg_range_20d': '',
-                'bars_count': 0,
-                'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            })
-            continue
-        
-        avg_volume = sum(volumes) / len(volumes)
-        avg_range = sum(ranges) / len(ranges)
-        
-        results.append({
-            'symbol': symbol,
-            'avg_volume_20d': avg_volume,
-            'avg_range_20d': avg_range,
-            'bars_count': len(volumes),
-            'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        })
-    
-    # Save results
+    # Calculate averages, streaming each row straight to the cache file
+    # instead of accumulating the whole universe in a list first
     OUTPUT_DIR.mkdir(exist_ok=True)
-    
-    print(f"\n[SAVE] Saving to {OUTPUT_FILE}...")
-    with open(OUTPUT_FILE, 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=[
-            'symbol', 'avg_volume_20d', 'avg_range_20d', 'bars_count', 'last_updated'
-        ])
-        writer.writeheader()
-        writer.writerows(results)
-    
+
+    print(f"\n[STATS] Calculating averages...")
+    print(f"\n[SAVE] Streaming to {OUTPUT_FILE}...")
+    successful = 0
+    samples = []
+    # 1 MiB write buffer: emit a few large write() syscalls instead of
+    # one per ~8 KB of rows
+    with open(OUTPUT_FILE, 'w', newline='', buffering=1 << 20) as f:
+        # Plain csv.writer on value lists: skips DictWriter's per-row
+        # fieldname mapping, and writerow dispatches straight to the C writer
+        writer = csv.writer(f)
+        writer.writerow(['symbol', 'avg_volume_20d', 'avg_range_20d',
+                         'bars_count', 'last_updated'])
+        # One strftime for the whole run; the stamp is per-refresh, not per-row
+        last_updated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for symbol in tickers:
+            volumes = symbol_data[symbol]['volumes'] if symbol in symbol_data else []
+            ranges = symbol_data[symbol]['ranges'] if symbol in symbol_data else []
+
+            if not volumes:
+                # No data for this symbol
+                writer.writerow([symbol, '', '', 0, last_updated])
+                continue
+
+            avg_volume = sum(volumes) / len(volumes)
+            avg_range = sum(ranges) / len(ranges)
+            writer.writerow([symbol, avg_volume, avg_range, len(volumes),
+                             last_updated])
+            successful += 1
+            if len(samples) < 5:
+                samples.append({'symbol': symbol, 'avg_volume_20d': avg_volume,
+                                'avg_range_20d': avg_range, 'bars_count': len(volumes)})
+
     # Summary
-    successful = sum(1 for r in results if r['bars_count'] > 0)
-    failed = len(results) - successful
+    failed = len(tickers) - successful
     
     print(f"\n{'='*80}")
     print(f"SUMMARY")
@@ -215,7 +199,6 @@ def calculate_stats(tickers):
     # Show sample results
     if successful > 0:
         print("Sample Results:")
-        samples = [r for r in results if r['bars_count'] > 0][:5]
         for r in samples:
             print(f"  {r['symbol']}: Vol={r['avg_volume_20d']:,.0f}, Range=${r['avg_range_20d']:.2f} ({r['bars_count']} days)")
 